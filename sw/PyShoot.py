@@ -1,13 +1,23 @@
 # main.py
 
+import io
 import os
 import pygame
 import random
+from collections import deque
+
+from asset_fs import AssetFS
+from ecs import ACTIVE, ENEMY_COMPONENTS, PROJECTILE_COMPONENTS, SPAWNING, World
+from frame_recorder import FrameRecorder
+from frame_scheduler import FrameScheduler
+from layer_pipeline import LayerPipeline
+from memory_profiler import MemoryProfiler
+from snapshot import load_snapshot, save_snapshot
+from stats_store import StatsStore
+from tuning import DEFAULT_TUNING, TuningWatcher
 
 # Screen constants - defines the game window size
 SCREEN_SIZE = (800, 600)  # Width: 800px, Height: 600px
-size = [SCREEN_SIZE[0], SCREEN_SIZE[1]]
-screen = pygame.display.set_mode(size)  # Create the game window
 
 # Defined colors for usage - RGB color values
 WHITE = (255, 255, 255)  # White background color
@@ -15,33 +25,324 @@ BLACK = (0, 0, 0)        # Black text color
 BLUE = (0, 100, 200)     # Blue background color
 CLOUD_GRAY = (180, 180, 180)  # Gray color for transparent clouds
 
+# Area in the top-left corner covered by the debug display
+HUD_SIZE = (120, 95)
+
 # Miscellaneous variables
 clock = pygame.time.Clock()  # Controls game frame rate
 
+# Default key bindings - action name -> pygame key (override with Game(key_bindings=...))
+DEFAULT_KEY_BINDINGS = {
+    'fire': pygame.K_SPACE,          # Fire bullets; release to start a game
+    'menu': pygame.K_ESCAPE,         # Return to the main menu
+    'pause': pygame.K_p,             # Toggle pause
+    'upgrade_left': pygame.K_1,      # Choose the left gun upgrade
+    'upgrade_right': pygame.K_2,     # Choose the right gun upgrade
+    'lose': pygame.K_l,              # End the current game
+    'quick_save': pygame.K_F5,       # Save a snapshot
+    'quick_load': pygame.K_F9,       # Restore the saved snapshot
+    'rewind': pygame.K_BACKSPACE,    # Step back through the rewind history
+    'record': pygame.K_F12           # Start/stop recording frames
+}
+
+# Resource folder - resolved once relative to the script location
+RES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'res')
+
+# Asset filesystem - serves the resources folder, reading from the zip archives in it when they have the file
+assets = AssetFS(RES_DIR)
+
+# Player sprite - also sets the size enemy sprites are scaled to
+PLAYER_SPRITE = ('aircrafts', 'images', 'aircraft_1.png')
+
+# Default folder for frame recordings
+CAPTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'captures')
+
+def load_image(*path_parts):
+    # Load an image from the resources (folder or archive) with transparency
+    # Raises pygame.error (or FileNotFoundError) if the image can't be loaded
+    data = assets.read(*path_parts)
+    return pygame.image.load(io.BytesIO(data), path_parts[-1]).convert_alpha()
+
+class AnimationClip(object):
+    # Precomputed animation clip - frame surfaces, anchor offsets and duration table
+    # are built once so drawing a frame is a single list lookup and blit
+    def __init__(self, frames, anchors, durations, loop=False):
+        self.frames = frames        # List of frame surfaces
+        self.anchors = anchors      # (dx, dy) blit offset of each frame from the attachment point
+        self.durations = durations  # Number of ticks each frame stays on screen
+        self.loop = loop            # Whether the clip wraps around instead of ending
+
+        # Expand the duration table into a tick -> frame index timeline
+        self.timeline = []
+        for frame_index, duration in enumerate(durations):
+            self.timeline.extend([frame_index] * duration)
+        self.length = len(self.timeline)  # Total clip duration (ticks)
+
+    @classmethod
+    def from_files(cls, path_parts, durations, anchor, fallback, loop=False, center_x=False):
+        # Build a clip from image files in the resources folder
+        # path_parts: list of path tuples relative to RES_DIR, one per frame
+        # anchor: (dx, dy) offset of the frame from the attachment point
+        # fallback: (color, radius) circle drawn if any frame can't be loaded
+        # center_x: center each frame horizontally on the anchor instead of left-aligning it
+        try:
+            frames = [load_image(*parts) for parts in path_parts]
+        except (pygame.error, FileNotFoundError):
+            # If images fail to load, use a single simple circle for every frame
+            color, radius = fallback
+            fallback_surface = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+            pygame.draw.circle(fallback_surface, color, (radius, radius), radius)
+            frames = [fallback_surface] * len(path_parts)
+            # Fallback circle is centered horizontally on the anchor, at the attachment height
+            anchors = [(anchor[0] - radius, -radius)] * len(path_parts)
+            return cls(frames, anchors, durations, loop)
+
+        anchors = []
+        for frame in frames:
+            dx = anchor[0] - (frame.get_width() // 2) if center_x else anchor[0]
+            anchors.append((dx, anchor[1]))
+        return cls(frames, anchors, durations, loop)
+
+    def frame_at(self, tick):
+        # Get the (surface, anchor) shown at the given tick, or None once a one-shot clip has ended
+        if tick < 0:
+            return None
+        if tick >= self.length:
+            if not self.loop:
+                return None
+            tick %= self.length
+        frame_index = self.timeline[tick]
+        return self.frames[frame_index], self.anchors[frame_index]
+
+    def draw(self, screen, tick, x, y):
+        # Draw the frame for the given tick relative to the attachment point (x, y)
+        frame = self.frame_at(tick)
+        if frame is not None:
+            surface, (dx, dy) = frame
+            screen.blit(surface, (x + dx, y + dy))
+
+class SpatialGrid(object):
+    # Uniform grid spatial index - entity ids are bucketed by the cells their bounding box covers
+    # Entries are only re-bucketed when they cross a cell boundary, so moving is usually O(1)
+    def __init__(self, cell_size=64):
+        self.cell_size = cell_size  # Width and height of a grid cell (pixels)
+        self.cells = {}             # (cell_x, cell_y) -> {entity id: None} (dict keeps insertion order)
+        self.entries = {}           # entity id -> cell range
+
+    def get_cell_range(self, x, y, width, height):
+        # Get the (first_x, first_y, last_x, last_y) cells covered by a bounding box
+        return (int(x) // self.cell_size, int(y) // self.cell_size,
+                int(x + width) // self.cell_size, int(y + height) // self.cell_size)
+
+    def insert(self, entity_id, x, y, width, height):
+        # Add an entity to every cell its bounding box covers
+        cell_range = self.get_cell_range(x, y, width, height)
+        self.entries[entity_id] = cell_range
+        self.add_to_cells(entity_id, cell_range)
+
+    def update(self, entity_id, x, y, width, height):
+        # Move an entity - only touches the cells if its cell range changed
+        cell_range = self.get_cell_range(x, y, width, height)
+        old_range = self.entries[entity_id]
+        if cell_range != old_range:
+            self.remove_from_cells(entity_id, old_range)
+            self.add_to_cells(entity_id, cell_range)
+            self.entries[entity_id] = cell_range
+
+    def remove(self, entity_id):
+        # Remove an entity from the index (ignored if it isn't indexed)
+        cell_range = self.entries.pop(entity_id, None)
+        if cell_range is not None:
+            self.remove_from_cells(entity_id, cell_range)
+
+    def clear(self):
+        # Remove all entities
+        self.cells = {}
+        self.entries = {}
+
+    def query(self, x, y, width, height):
+        # Get the ids of entities whose cells overlap a bounding box (candidates for a precise test)
+        first_x, first_y, last_x, last_y = self.get_cell_range(x, y, width, height)
+        found = {}  # Dict keeps a stable order and drops entities covering several cells
+        for cell_x in range(first_x, last_x + 1):
+            for cell_y in range(first_y, last_y + 1):
+                cell = self.cells.get((cell_x, cell_y))
+                if cell:
+                    found.update(cell)
+        return list(found)
+
+    def add_to_cells(self, entity_id, cell_range):
+        first_x, first_y, last_x, last_y = cell_range
+        for cell_x in range(first_x, last_x + 1):
+            for cell_y in range(first_y, last_y + 1):
+                self.cells.setdefault((cell_x, cell_y), {})[entity_id] = None
+
+    def remove_from_cells(self, entity_id, cell_range):
+        first_x, first_y, last_x, last_y = cell_range
+        for cell_x in range(first_x, last_x + 1):
+            for cell_y in range(first_y, last_y + 1):
+                cell = self.cells.get((cell_x, cell_y))
+                if cell is not None:
+                    cell.pop(entity_id, None)
+                    if not cell:
+                        del self.cells[(cell_x, cell_y)]
+
+def make_circle_mask(radius):
+    # Build a collision mask for a round projectile of the given radius
+    circle_surface = pygame.Surface((radius * 2 + 1, radius * 2 + 1), pygame.SRCALPHA)
+    pygame.draw.circle(circle_surface, WHITE, (radius, radius), radius)
+    return pygame.mask.from_surface(circle_surface)
+
+class Presenter(object):
+    # Presents the fixed logical game surface (SCREEN_SIZE) in a window of any size or fullscreen
+    # All game drawing and layout happens at the logical size; only presenting depends on the window.
+    # Modes:
+    #   'direct'  - window is the logical size, drawn to directly (no scaling)
+    #   'scaled'  - SDL scales the logical surface on the GPU (pygame.SCALED), no per-frame CPU scaling;
+    #               SDL picks the window size (the largest whole factor that fits the desktop), so
+    #               window_size is ignored - resize the window afterwards
+    #   'integer' - nearest-neighbour scale by a whole factor into a reused buffer (fast path)
+    #   'smooth'  - smoothscale to fit the window into a reused buffer, keeping the aspect ratio
+    #   'auto'    - 'direct' for a logical-size window, 'scaled' for fullscreen, otherwise 'integer'
+    #               if the window is a whole multiple of the logical size and 'smooth' if it isn't
+    def __init__(self, window_size=SCREEN_SIZE, fullscreen=False, mode='auto'):
+        if mode == 'auto':
+            width_factor, width_remainder = divmod(window_size[0], SCREEN_SIZE[0])
+            height_factor, height_remainder = divmod(window_size[1], SCREEN_SIZE[1])
+            if fullscreen:
+                mode = 'scaled'
+            elif tuple(window_size) == tuple(SCREEN_SIZE):
+                mode = 'direct'
+            elif width_factor == height_factor >= 1 and not width_remainder and not height_remainder:
+                mode = 'integer'
+            else:
+                mode = 'smooth'
+        self.mode = mode              # Presentation mode (see above)
+        self.fullscreen = fullscreen  # Whether the window covers the whole display
+        self.window = None            # Display surface
+        self.surface = None           # Logical surface the game draws on
+        self.scaled_surface = None    # Reused scaling buffer ('integer' and 'smooth' modes)
+        self.scale = 1.0              # Window pixels per logical pixel
+        self.offset = (0, 0)          # Top-left of the presented image in the window (letterboxing)
+        self.present_integer = False  # Whether the buffer is filled by whole-factor scaling
+        self.set_window(window_size)
+
+    def set_window(self, window_size):
+        # Create or resize the window and precompute everything presenting needs at this resolution
+        flags = pygame.FULLSCREEN if self.fullscreen else 0
+        if self.mode in ('direct', 'scaled'):
+            if self.mode == 'scaled':
+                flags |= pygame.SCALED | pygame.RESIZABLE
+            # The window itself is the logical surface - SDL handles any scaling
+            current = pygame.display.get_surface()
+            if current is None or current.get_size() != tuple(SCREEN_SIZE) or flags:
+                try:
+                    current = pygame.display.set_mode(SCREEN_SIZE, flags)
+                except pygame.error:
+                    # No GPU renderer available (e.g. some drivers) - fall back to CPU integer scaling
+                    print("Hardware scaling unavailable - using integer scaling")
+                    self.mode = 'integer'
+                    self.set_window(window_size)
+                    return
+            self.window = current
+            self.surface = current
+            return
+
+        self.window = pygame.display.set_mode(window_size, flags | pygame.RESIZABLE)
+        window_width, window_height = self.window.get_size()
+        if self.surface is None:
+            self.surface = pygame.Surface(SCREEN_SIZE).convert()  # Same pixel format as the window
+
+        # Largest scale that fits the window, whole factors only in 'integer' mode
+        self.scale = min(window_width / SCREEN_SIZE[0], window_height / SCREEN_SIZE[1])
+        integer_scale = int(self.scale)
+        use_integer = self.mode == 'integer' and integer_scale >= 1
+        if use_integer:
+            self.scale = integer_scale
+        scaled_size = (int(SCREEN_SIZE[0] * self.scale), int(SCREEN_SIZE[1] * self.scale))
+        self.offset = ((window_width - scaled_size[0]) // 2, (window_height - scaled_size[1]) // 2)
+        self.present_integer = use_integer
+
+        # Allocate the scaling buffer once per resolution and clear the letterbox bars
+        self.scaled_surface = pygame.Surface(scaled_size).convert()
+        self.window.fill(BLACK)
+
+    def present(self):
+        # Show the logical surface in the window
+        if self.scaled_surface is not None:
+            if self.present_integer:
+                pygame.transform.scale(self.surface, self.scaled_surface.get_size(), self.scaled_surface)
+            else:
+                pygame.transform.smoothscale(self.surface, self.scaled_surface.get_size(), self.scaled_surface)
+            self.window.blit(self.scaled_surface, self.offset)
+        pygame.display.flip()
+
+    def to_logical(self, position):
+        # Convert a window position (e.g. the mouse) to logical coordinates
+        if self.scaled_surface is None:
+            return position  # 'direct' and 'scaled' already report logical coordinates
+        return (int((position[0] - self.offset[0]) / self.scale),
+                int((position[1] - self.offset[1]) / self.scale))
+
+class CachedPanel(object):
+    # Retained-mode UI panel - a full-screen composite surface that is rebuilt only when its
+    # inputs change, so showing it costs one blit per frame
+    def __init__(self, build):
+        self.build = build    # Function drawing the panel onto a transparent surface
+        self.inputs = None    # Inputs the cached surface was built from
+        self.surface = None   # Cached composite surface
+
+    def get(self, inputs=()):
+        # Get the panel surface for the given inputs, rebuilding it only if they changed
+        if self.surface is None or inputs != self.inputs:
+            self.surface = pygame.Surface(SCREEN_SIZE, pygame.SRCALPHA)
+            self.build(self.surface)
+            self.inputs = inputs
+        return self.surface
+
+class InputState(object):
+    # Input snapshot for one tick - filled once by Game.process_events and read by every
+    # subsystem, so they all see the same mouse position
+    # Key and button events are dispatched to their handlers as they're drained, in order
+    def __init__(self):
+        self.mouse_x = 0              # Mouse position, clamped so the aircraft stays on screen
+        self.mouse_y = 0
+        self.quit = False             # Window close requested
+
+    def begin_tick(self, mouse_x, mouse_y):
+        # Start a new tick - store the clamped mouse position
+        self.mouse_x = mouse_x
+        self.mouse_y = mouse_y
+
 class Game(object):
-    def __init__(self, score=0, session_number=0):
+    def __init__(self, score=0, session_number=0, key_bindings=None, presenter=None):
         # Constructor. Create and initialize all attributes
+        self.presenter = presenter or Presenter()  # Shows the logical game surface in the window
         self.score = score                    # Player's current score
         self.session_number = session_number  # Number of games played
         self.game_active = False             # Flag to track if game is currently running
         self.cloud_offset = 0                # Offset for cloud movement animation
         
+        # Entity storage - one dense archetype (typed component arrays) per entity type
+        self.world = World()
+        self.pending_hits = []               # (enemy id, damage, weapon) found by collision systems this frame
+        
         # Firing system attributes
         self.is_firing = False               # Flag to track if currently firing
         self.muzzle_flash_frame = 0          # Current frame of muzzle flash animation
         self.muzzle_flash_duration = 8       # How long muzzle flash lasts (frames)
-        self.bullets = []                    # List to store active bullets
+        self.bullets = self.world.add_archetype('bullets', PROJECTILE_COMPONENTS)  # Active bullets
         self.fire_cooldown = 0               # Cooldown between shots
-        self.fire_rate = 5                   # Minimum frames between shots (reduced for faster firing)
+        self.bullet_radius = 3               # Bullet size (pixels) for drawing and collision
         self.mouse_held = False              # Flag to track if mouse button is held down
         
         # Rocket firing system attributes
         self.is_rocket_firing = False        # Flag to track if currently rocket firing
         self.rocket_flash_frame = 0          # Current frame of rocket flash animation
         self.rocket_flash_duration = 8       # How long rocket flash lasts (frames)
-        self.rockets = []                    # List to store active rockets
+        self.rockets = self.world.add_archetype('rockets', PROJECTILE_COMPONENTS)  # Active rockets
         self.rocket_fire_cooldown = 0        # Cooldown between rocket shots
-        self.rocket_fire_rate = 7            # 30% slower than bullets (5 * 1.3 = 6.5, rounded to 7)
+        self.rocket_radius = 5               # Rocket size (pixels) for drawing and collision
         self.right_mouse_held = False        # Flag to track if right mouse button is held down
         
         # Game state attributes
@@ -50,122 +351,326 @@ class Game(object):
         self.upgrade_available = False       # Flag to track if upgrade menu should be shown
         self.last_upgrade_score = 0          # Track the last score when upgrade was offered
         
+        # Player health system
+        self.player_max_health = 3           # Number of enemy contacts the player survives
+        self.player_health = self.player_max_health  # Player's current health
+        self.player_invulnerable = 0         # Frames of invulnerability left after being hit
+        self.player_invulnerable_duration = 90  # Invulnerability after a hit (1.5 seconds at 60 FPS)
+        self.player_sprite = None            # Cached player surface and collision mask
+        self.wingmen = []                    # (x, y) of the other players in a co-op session, drawn with the player
+        
+        # Session statistics - persisted by the stats store when the session ends
+        self.stats_store = StatsStore()      # Background SQLite writer and cached leaderboard
+        self.session_start_time = 0          # pygame ticks (ms) when the current session started
+        self.session_kills = {}              # Enemies destroyed this session per weapon
+        self.session_points = 0              # Points earned this session (upgrades don't spend them) - ranks the leaderboard
+        self.session_upgrades = []           # (weapon, level, score, seconds into session) per upgrade
+        
+        # Snapshot system - quick-save slot and rewind history for debugging
+        self.quick_save_data = None          # Snapshot bytes saved with F5, restored with F9
+        self.rewind_buffer = deque(maxlen=20)  # Recent snapshots, newest last (rewind with BACKSPACE)
+        self.rewind_interval = 30            # Frames between rewind snapshots (0.5 seconds at 60 FPS)
+        
+        # Frame capture - set while recording presented frames to disk
+        self.recorder = None                 # Active FrameRecorder, if any
+        self.record_format = 'raw'           # Format for recordings started with F12 ('raw' or 'png')
+
+        # Frame pacing - measures each frame and runs low-priority jobs in the leftover budget
+        self.scheduler = FrameScheduler(clock, 60)
+
+        # Pipelined rendering - background and HUD drawn on a worker thread (see --pipelined-render)
+        self.layer_pipeline = None           # Active LayerPipeline, if any
+
+        # Memory profiling (diagnostics mode, see --profile-memory)
+        self.memory_profiler = None          # Active MemoryProfiler, if any
+        
         # Weapon upgrade system
         self.left_weapon_level = 1           # Left click weapon level (bullets)
         self.right_weapon_level = 1          # Right click weapon level (rockets)
         self.upgrade_threshold = 200         # Points needed for first upgrade
         
         # Enemy system attributes
-        self.enemies = []                    # List to store active enemies
+        self.enemies = self.world.add_archetype('enemies', ENEMY_COMPONENTS)  # Active enemies
+        self.enemy_grid = SpatialGrid()      # Spatial index of ACTIVE enemy ids, kept up to date by bounce_system
         self.max_enemies = 10               # Maximum number of enemies on screen at once
         self.enemy_spawn_cooldown = 0       # Cooldown between enemy spawns
-        self.enemy_spawn_rate = 60          # Frames between enemy spawns (1 second at 60 FPS)
-        self.enemy_health = 6               # Enemy health (6 for bullets=4 hits, rockets=3 hits with 2 damage each)
-        self.enemy_sprites = [              # List of available enemy sprite names
-            'C1.png', 'C2.png', 'C3.png', 'C4.png', 'C5.png', 'C6.png', 'C7.png', 'C8.png', 'C9.png',
-            'C10.png', 'C11.png', 'C12.png', 'C13.png', 'C14.png', 'C15.png', 'C16.png', 'C17.png', 'C18.png'
-        ]
+        self.enemy_sprites = []             # Enemy sprite names - an enemy's sprite id indexes this list
+        self.enemy_sprite_cache = {}        # Scaled enemy sprite and collision mask per sprite name
+        self.kill_points = {'bullets': 10, 'rockets': 15}  # Points for destroying an enemy per weapon
+        
+        # Tuning data - balance values and sprite lists from res/tuning.json, reloaded when it changes
+        # (fire_rate, rocket_fire_rate, enemy_spawn_rate, enemy_health, upgrade_costs,
+        # upgrade_cost_step and enemy_sprites are set by apply_tuning)
+        self.tuning = TuningWatcher()        # Polls the tuning file and sprite files for changes
+        self.apply_tuning(self.tuning.load() or DEFAULT_TUNING)
+        
+        # Collision masks for projectiles, built once per projectile size
+        self.projectile_masks = {
+            self.bullet_radius: make_circle_mask(self.bullet_radius),
+            self.rocket_radius: make_circle_mask(self.rocket_radius)
+        }
         
         pygame.init()                        # Initialize pygame modules
         pygame.mouse.set_visible(False)      # Hide mouse cursor during gameplay
         pygame.display.set_caption('PyShoot') # Set window title
 
+        # Input system - per-tick input snapshot and dispatch tables
+        self.input = InputState()            # Input snapshot for the current tick
+        self.bind_keys(key_bindings)         # Build the key and mouse dispatch tables
+        
+        # Menu system - fonts are created once, menus are cached composite surfaces
+        self.fonts = {}                      # Font size -> serif font
+        self.menu_panels = {
+            'title': CachedPanel(self.build_title_panel),
+            'game_over': CachedPanel(self.build_game_over_panel),
+            'pause': CachedPanel(self.build_pause_panel),
+            'upgrade': CachedPanel(self.build_upgrade_panel)
+        }
+        
+        # Animation system attributes
+        self.animation_tick = 0              # Global tick counter for looping animations
+        self.load_animations()               # Precompute all animation clips once
+
     """ Main game play class """
 
+    def load_animations(self):
+        # Build every animation clip once - frames, anchors and timelines are reused every frame
+
+        # Muzzle flash: 24 frames (0-23), every 3rd frame shown for 1 tick to speed up the animation
+        # Positioned at the front of the aircraft, centered horizontally and slightly ahead
+        self.muzzle_flash_clip = AnimationClip.from_files(
+            [('explosions', 'images', 'muzzle', f'muzzle2_{(frame * 3) % 24:04d}.png')
+             for frame in range(self.muzzle_flash_duration)],
+            [1] * self.muzzle_flash_duration,
+            anchor=(25, -10),
+            fallback=((255, 255, 0), 10),  # Simple yellow circle if images are missing
+            center_x=True)
+
+        # Rocket flame: 16 frames (0-15), every 2nd frame shown for 1 tick
+        self.rocket_flash_clip = AnimationClip.from_files(
+            [('explosions', 'images', 'rocket_flame', f'rocket_1_{(frame * 2) % 16:04d}.png')
+             for frame in range(self.rocket_flash_duration)],
+            [1] * self.rocket_flash_duration,
+            anchor=(25, -15),
+            fallback=((255, 165, 0), 12),  # Simple orange circle if images are missing
+            center_x=True)
+
+        # Propeller: 3 frames looping over the aircraft nose, 2 ticks each
+        self.propeller_clip = AnimationClip.from_files(
+            [('aircrafts', 'images', f'aircraft_1_prop_{frame}.png') for frame in range(1, 4)],
+            [2, 2, 2],
+            anchor=(0, 0),
+            fallback=((40, 40, 40), 1),  # Barely visible dot if images are missing
+            loop=True)
+
+    def bind_keys(self, key_bindings=None):
+        # Build the dispatch tables - key bindings override DEFAULT_KEY_BINDINGS per action
+        self.key_bindings = dict(DEFAULT_KEY_BINDINGS)
+        if key_bindings:
+            self.key_bindings.update(key_bindings)
+        keys = self.key_bindings
+        
+        # Event type -> handler
+        self.event_handlers = {
+            pygame.QUIT: self.on_quit,
+            pygame.KEYDOWN: self.on_key_down,
+            pygame.KEYUP: self.on_key_up,
+            pygame.MOUSEBUTTONDOWN: self.on_mouse_down,
+            pygame.MOUSEBUTTONUP: self.on_mouse_up,
+            pygame.VIDEORESIZE: self.on_window_resized
+        }
+        # Key -> action handler
+        self.key_down_handlers = {
+            keys['fire']: self.on_fire_pressed,
+            keys['menu']: self.on_menu_pressed,
+            keys['pause']: self.on_pause_pressed,
+            keys['quick_save']: self.on_quick_save_pressed,
+            keys['quick_load']: self.on_quick_load_pressed,
+            keys['rewind']: self.on_rewind_pressed,
+            keys['record']: self.on_record_pressed,
+            keys['upgrade_left']: self.on_upgrade_left_pressed,
+            keys['upgrade_right']: self.on_upgrade_right_pressed
+        }
+        self.key_up_handlers = {
+            keys['fire']: self.on_fire_released,
+            keys['lose']: self.on_lose_released
+        }
+        # Mouse button -> action handler (1=left, 2=middle, 3=right)
+        self.mouse_down_handlers = {
+            1: self.on_left_click,
+            3: self.on_right_click
+        }
+        self.mouse_up_handlers = {
+            1: self.on_left_release,
+            3: self.on_right_release
+        }
+
     def process_events(self):
-        # Handle all user input events (keyboard, mouse, window close)
+        # Drain the event queue once into the per-tick input snapshot and dispatch each event
+        mx, my = self.presenter.to_logical(pygame.mouse.get_pos())
+        
+        # Apply screen boundaries once per tick - keep aircraft fully within screen
+        self.input.begin_tick(*self.clamp_position(mx, my))
+        
         for event in pygame.event.get():
-            # Check if user wants to close the window
-            if event.type == pygame.QUIT:
-                print("User asked to quit.")
-                return True  # Signal to exit the game loop
-            
-            # Handle space bar key press (down)
-            elif event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE:
-                print("User pressed the space bar")
-                # Fire weapon if game is active and not paused
-                if self.game_active and not self.game_paused:
-                    self.fire_weapon()
-            
-            # Handle ESC key press - exit to main menu
-            elif event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
-                print("User pressed ESC - returning to main menu")
-                if self.game_active:
-                    self.game_active = False  # Exit to main menu
-                    # Reset game state
-                    self.mouse_held = False
-                    self.right_mouse_held = False
-                    self.is_firing = False
-                    self.is_rocket_firing = False
-                    self.game_paused = False  # Reset pause state
-            
-            # Handle P key press - toggle pause
-            elif event.type == pygame.KEYDOWN and event.key == pygame.K_p:
-                if self.game_active:
-                    self.game_paused = not self.game_paused  # Toggle pause state
-                    if self.game_paused:
-                        print("Game paused")
-                        # Stop continuous firing when pausing
-                        self.mouse_held = False
-                        self.right_mouse_held = False
-                    else:
-                        print("Game unpaused")
-            
-            # Handle upgrade selection
-            elif event.type == pygame.KEYDOWN and event.key == pygame.K_1:
-                if self.upgrade_available:
-                    self.upgrade_left_weapon()
-            elif event.type == pygame.KEYDOWN and event.key == pygame.K_2:
-                if self.upgrade_available:
-                    self.upgrade_right_weapon()
-            
-            # Handle key releases
-            elif event.type == pygame.KEYUP:
-                if event.key == pygame.K_SPACE:
-                    print("User let go of the space bar key")
-                    # Start game only if it's not already active
-                    if not self.game_active:
-                        self.session_number += 1  # Increment game session
-                        self.game_active = True   # Activate the game
-                        self.game_started = False # Reset game started flag for new session
-                        print('')
-                elif event.key == pygame.K_l:
-                    print("Lose Game!")
-                    self.game_active = False  # End the current game
-            
-            # Handle mouse button clicks
-            elif event.type == pygame.MOUSEBUTTONDOWN:
-                if event.button == 1:  # Left mouse button (1=left, 2=middle, 3=right)
-                    print("User clicked left mouse button")
-                    if self.game_active and not self.game_paused:
-                        # Set mouse held flag for continuous firing
-                        self.mouse_held = True
-                        # Fire weapon immediately
-                        self.fire_weapon()
-                    elif not self.game_active:
-                        # Start game only if it's not already active
-                        self.session_number += 1  # Increment game session
-                        self.game_active = True   # Activate the game
-                        self.game_started = False # Reset game started flag for new session
-                        print('Game started with mouse click')
-                elif event.button == 3:  # Right mouse button
-                    print("User clicked right mouse button")
-                    if self.game_active and not self.game_paused:
-                        # Set right mouse held flag for continuous rocket firing
-                        self.right_mouse_held = True
-                        # Fire rocket immediately
-                        self.fire_rocket()
-            
-            # Handle mouse button releases
-            elif event.type == pygame.MOUSEBUTTONUP:
-                if event.button == 1:  # Left mouse button released
-                    print("User released left mouse button")
-                    self.mouse_held = False  # Stop continuous firing
-                elif event.button == 3:  # Right mouse button released
-                    print("User released right mouse button")
-                    self.right_mouse_held = False  # Stop continuous rocket firing
+            handler = self.event_handlers.get(event.type)
+            if handler is not None:
+                handler(event)
+
+        return self.input.quit  # True signals to exit the game loop
+
+    def clamp_position(self, x, y):
+        # Clamp an aircraft position so the whole aircraft stays on screen
+        player_surface, _ = self.get_player_sprite()
+        return (max(0, min(x, SCREEN_SIZE[0] - player_surface.get_width())),
+                max(0, min(y, SCREEN_SIZE[1] - player_surface.get_height())))
+
+    def on_quit(self, event):
+        # User wants to close the window
+        print("User asked to quit.")
+        self.input.quit = True
+
+    def on_window_resized(self, event):
+        # Recompute the presentation for the new window size
+        if self.presenter.mode in ('integer', 'smooth'):
+            self.presenter.set_window(event.size)
+
+    def on_key_down(self, event):
+        # Run the bound action, if any
+        handler = self.key_down_handlers.get(event.key)
+        if handler is not None:
+            handler()
+
+    def on_key_up(self, event):
+        handler = self.key_up_handlers.get(event.key)
+        if handler is not None:
+            handler()
+
+    def on_mouse_down(self, event):
+        handler = self.mouse_down_handlers.get(event.button)
+        if handler is not None:
+            handler()
+
+    def on_mouse_up(self, event):
+        handler = self.mouse_up_handlers.get(event.button)
+        if handler is not None:
+            handler()
+
+    def on_fire_pressed(self):
+        print("User pressed the space bar")
+        # Fire weapon if game is active and not paused
+        if self.game_active and not self.game_paused:
+            self.fire_weapon()
+
+    def on_fire_released(self):
+        print("User let go of the space bar key")
+        # Start game only if it's not already active
+        if not self.game_active:
+            self.session_number += 1  # Increment game session
+            self.game_active = True   # Activate the game
+            self.game_started = False # Reset game started flag for new session
+            print('')
+
+    def on_menu_pressed(self):
+        # Exit to main menu
+        print("User pressed ESC - returning to main menu")
+        if self.game_active:
+            self.end_session()        # Exit to main menu
+            # Reset game state
+            self.mouse_held = False
+            self.right_mouse_held = False
+            self.is_firing = False
+            self.is_rocket_firing = False
+            self.game_paused = False  # Reset pause state
 
-        return False  # Continue running the game
+    def on_pause_pressed(self):
+        # Toggle pause
+        if self.game_active:
+            self.game_paused = not self.game_paused  # Toggle pause state
+            if self.game_paused:
+                print("Game paused")
+                # Stop continuous firing when pausing
+                self.mouse_held = False
+                self.right_mouse_held = False
+            else:
+                print("Game unpaused")
+
+    def on_quick_save_pressed(self):
+        if self.game_active:
+            self.quick_save_data = save_snapshot(self, pygame.time.get_ticks())
+            print(f"Quick-saved ({len(self.quick_save_data)} bytes)")
+
+    def on_quick_load_pressed(self):
+        if self.quick_save_data is not None:
+            load_snapshot(self, self.quick_save_data, pygame.time.get_ticks())
+            self.rewind_buffer.clear()  # History after the save point no longer applies
+            print("Quick-loaded")
+
+    def on_rewind_pressed(self):
+        if self.game_active and self.rewind_buffer:
+            load_snapshot(self, self.rewind_buffer.pop(), pygame.time.get_ticks())
+            print(f"Rewound ({len(self.rewind_buffer)} snapshots left)")
+
+    def on_record_pressed(self):
+        # Start or stop recording frames
+        if self.recorder is None:
+            directory = os.path.join(CAPTURE_DIR, f'capture_{pygame.time.get_ticks()}')
+            self.start_recording(directory, self.record_format)
+        else:
+            self.stop_recording()
+
+    def start_recording(self, directory, file_format='raw'):
+        # Record every presented frame to the given folder
+        self.recorder = FrameRecorder(directory, self.presenter.surface, file_format)
+        print(f"Recording frames to {directory}")
+
+    def stop_recording(self):
+        # Finish writing queued frames and stop recording
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
+
+    def on_upgrade_left_pressed(self):
+        if self.upgrade_available:
+            self.upgrade_left_weapon()
+
+    def on_upgrade_right_pressed(self):
+        if self.upgrade_available:
+            self.upgrade_right_weapon()
+
+    def on_lose_released(self):
+        print("Lose Game!")
+        self.end_session()        # End the current game
+
+    def on_left_click(self):
+        print("User clicked left mouse button")
+        if self.game_active and not self.game_paused:
+            # Set mouse held flag for continuous firing
+            self.mouse_held = True
+            # Fire weapon immediately
+            self.fire_weapon()
+        elif not self.game_active:
+            # Start game only if it's not already active
+            self.session_number += 1  # Increment game session
+            self.game_active = True   # Activate the game
+            self.game_started = False # Reset game started flag for new session
+            print('Game started with mouse click')
+
+    def on_right_click(self):
+        print("User clicked right mouse button")
+        if self.game_active and not self.game_paused:
+            # Set right mouse held flag for continuous rocket firing
+            self.right_mouse_held = True
+            # Fire rocket immediately
+            self.fire_rocket()
+
+    def on_left_release(self):
+        print("User released left mouse button")
+        self.mouse_held = False  # Stop continuous firing
+
+    def on_right_release(self):
+        print("User released right mouse button")
+        self.right_mouse_held = False  # Stop continuous rocket firing
 
     def run_logic(self):
         # Execute game logic only when the game is active and not paused
@@ -175,56 +680,83 @@ class Game(object):
                 self.begin_game()  # Run the main game initialization
                 self.game_started = True  # Mark game as started
             
-            # Handle continuous firing while mouse is held
-            if self.mouse_held and self.fire_cooldown <= 0:
-                self.fire_weapon()
-            
-            # Handle continuous rocket firing while right mouse is held
-            if self.right_mouse_held and self.rocket_fire_cooldown <= 0:
-                self.fire_rocket()
+            for _ in self.each_player():
+                # Handle continuous firing while mouse is held
+                if self.mouse_held and self.fire_cooldown <= 0:
+                    self.fire_weapon()
+                
+                # Handle continuous rocket firing while right mouse is held
+                if self.right_mouse_held and self.rocket_fire_cooldown <= 0:
+                    self.fire_rocket()
             
-            # Update bullet positions
-            self.update_bullets()
+            # Move every entity by its velocity
+            self.movement_system(self.bullets)
+            self.movement_system(self.rockets)
+            self.movement_system(self.enemies)
             
-            # Update rocket positions
-            self.update_rockets()
+            # Bounce enemies off the screen edges
+            self.bounce_system()
             
-            # Update enemy positions and spawn new enemies
-            self.update_enemies()
+            # Spawn new enemies
             self.spawn_enemies()
             
-            # Check for bullet-enemy collisions
-            self.check_bullet_enemy_collisions()
+            # Find projectile-enemy hits, then apply their damage
+            self.projectile_collision_system(self.bullets, 'bullets')
+            self.projectile_collision_system(self.rockets, 'rockets')
+            self.damage_system()
+            
+            # Check for player-enemy contact
+            for _ in self.each_player():
+                self.player_collision_system()
             
-            # Check for rocket-enemy collisions
-            self.check_rocket_enemy_collisions()
+            # Update lifecycle states, remove dead entities in bulk and rebuild the draw/collision sets
+            self.lifecycle_stage()
             
             # Check for upgrade availability
             self.check_upgrade_availability()
             
-            # Update muzzle flash animation
-            self.update_muzzle_flash()
-            
-            # Update rocket flash animation
-            self.update_rocket_flash()
-            
-            # Update fire cooldowns
-            if self.fire_cooldown > 0:
-                self.fire_cooldown -= 1
-            if self.rocket_fire_cooldown > 0:
-                self.rocket_fire_cooldown -= 1
+            for _ in self.each_player():
+                # Update muzzle flash animation
+                self.update_muzzle_flash()
+                
+                # Update rocket flash animation
+                self.update_rocket_flash()
+                
+                # Update fire cooldowns
+                if self.fire_cooldown > 0:
+                    self.fire_cooldown -= 1
+                if self.rocket_fire_cooldown > 0:
+                    self.rocket_fire_cooldown -= 1
+                if self.player_invulnerable > 0:
+                    self.player_invulnerable -= 1
             if self.enemy_spawn_cooldown > 0:
                 self.enemy_spawn_cooldown -= 1
             
+            # Advance the global animation tick (propellers and other looping clips)
+            self.animation_tick += 1
+            
+            # Record a rewind snapshot at regular intervals
+            if self.animation_tick % self.rewind_interval == 0:
+                self.rewind_buffer.append(save_snapshot(self, pygame.time.get_ticks()))
+            
             # Update cloud animation - make clouds move downward smoothly
             self.cloud_offset += 0.5  # Move clouds down by 0.5 pixels per frame for smoother movement
 
+    def each_player(self):
+        # Iterate over the players that the per-player systems (firing, player collision,
+        # cooldowns) run for - just the local player here; the co-op server loads each
+        # remote player's state into the game in turn
+        yield self
+
     def display_frame(self, screen):
         # Clear screen and draw all visual elements
-        screen.fill(BLUE)  # Fill screen with blue background
-        
-        # Draw clouds on the background for all screens
-        self.draw_clouds(screen)
+        if self.layer_pipeline is not None:
+            # Background and HUD layers were drawn by the pipeline worker - just composite them
+            background, hud = self.layer_pipeline.take(self.cloud_offset, self.get_hud_inputs())
+            screen.blit(background, (0, 0))
+        else:
+            # Draw the blue sky and clouds on the background for all screens
+            self.draw_background(screen, self.cloud_offset)
         
         # Display different screens based on game state
         if not self.game_active:
@@ -246,17 +778,62 @@ class Game(object):
             self.user_character(screen)
         
         # Always show debug information in top-left corner
-        self.user_debug_display(screen)
-        pygame.display.flip()  # Update the display with all drawn elements
+        if self.layer_pipeline is not None:
+            screen.blit(hud, (0, 0))
+        else:
+            self.user_debug_display(screen)
+        # Copy the finished frame for the recorder (dropped rather than waited for if it's behind)
+        if self.recorder is not None:
+            self.recorder.capture(screen)
+        
+        self.presenter.present()  # Update the display with all drawn elements
+        
+        # Start drawing the next frame's layers while its events and logic run
+        # The clouds move only while the game runs; a wrong guess is redrawn by take()
+        if self.layer_pipeline is not None:
+            next_cloud_offset = self.cloud_offset
+            if self.game_active and not self.game_paused:
+                next_cloud_offset += 0.5
+            self.layer_pipeline.request(next_cloud_offset, self.get_hud_inputs())
+
+    def start_layer_pipeline(self):
+        # Draw the background and HUD on a worker thread from now on
+        if self.layer_pipeline is not None:
+            return
+        # The pipeline's own font, separate from the menus' fonts so the worker never renders with a
+        # font the main thread is using. take() also redraws mispredicted HUDs with it on the main
+        # thread, which is safe only because take() waits for the worker to finish first.
+        hud_font = pygame.font.SysFont("serif", 15)
+        self.layer_pipeline = LayerPipeline(
+            self.presenter.surface, self.draw_background,
+            lambda surface, inputs: self.draw_hud(surface, inputs, hud_font), HUD_SIZE)
+
+    def stop_layer_pipeline(self):
+        # Go back to drawing every layer on the main thread
+        if self.layer_pipeline is not None:
+            self.layer_pipeline.close()
+            self.layer_pipeline.report()
+            self.layer_pipeline = None
 
     def begin_game(self):
         # Game initialization logic - runs only once when game starts
         print('Game initialized!')
         
-        # Clear any existing projectiles from previous sessions
-        self.bullets = []
-        self.rockets = []
-        self.enemies = []
+        # Clear any existing projectiles and enemies from previous sessions
+        self.world.clear()
+        self.enemy_grid.clear()
+        self.pending_hits = []
+        self.rewind_buffer.clear()
+        
+        # Restore player health
+        self.player_health = self.player_max_health
+        self.player_invulnerable = 0
+        
+        # Start collecting statistics for this session
+        self.session_start_time = pygame.time.get_ticks()
+        self.session_kills = {'bullets': 0, 'rockets': 0}
+        self.session_points = 0
+        self.session_upgrades = []
         
         # Reset firing states
         self.is_firing = False
@@ -268,13 +845,35 @@ class Game(object):
         self.fire_cooldown = 0
         self.rocket_fire_cooldown = 0
 
+    def end_session(self):
+        # End the current game and queue its statistics for saving (written on a background thread)
+        if self.game_active and self.game_started:
+            self.stats_store.record_session({
+                'session_number': self.session_number,
+                'score': self.session_points,
+                'duration': (pygame.time.get_ticks() - self.session_start_time) / 1000.0,
+                'kills': dict(self.session_kills),
+                'upgrades': list(self.session_upgrades)
+            })
+        self.game_active = False
+
+    def get_font(self, size):
+        # Get the serif font of the given size, created once
+        if size not in self.fonts:
+            self.fonts[size] = pygame.font.SysFont("serif", size)
+        return self.fonts[size]
+
     def game_over_screen(self, screen):
         # Display the game over screen with restart instructions
         print('game over')
+        screen.blit(self.menu_panels['game_over'].get(), (0, 0))
+
+    def build_game_over_panel(self, screen):
+        # Draw the game over text onto the cached panel surface
         
-        # Create fonts for different text sizes
-        game_over = pygame.font.SysFont("serif", 25)   # Larger font for main text
-        click_enter = pygame.font.SysFont("serif", 15) # Smaller font for instructions
+        # Get fonts for different text sizes
+        game_over = self.get_font(25)   # Larger font for main text
+        click_enter = self.get_font(15) # Smaller font for instructions
         
         # Render text surfaces with black color
         main_text = game_over.render("Game Over", True, BLACK)
@@ -293,11 +892,16 @@ class Game(object):
     def title_screen(self, screen):
         # Display the initial title screen with play instructions
         print('title screen')
+        # Rebuilt only when the leaderboard changes
+        screen.blit(self.menu_panels['title'].get(tuple(self.stats_store.leaderboard)), (0, 0))
+
+    def build_title_panel(self, screen):
+        # Draw the title, controls and high scores onto the cached panel surface
         
-        # Create fonts for different text sizes
-        title_font = pygame.font.SysFont("serif", 35)
-        instruction_font = pygame.font.SysFont("serif", 20)
-        controls_font = pygame.font.SysFont("serif", 16)
+        # Get fonts for different text sizes
+        title_font = self.get_font(35)
+        instruction_font = self.get_font(20)
+        controls_font = self.get_font(16)
         
         # Render text surfaces
         title_text = title_font.render("PyShoot", True, BLACK)
@@ -341,20 +945,31 @@ class Game(object):
         # Pause instruction
         pause_x = screen_center_x - (pause_text.get_width() // 2)
         screen.blit(pause_text, [pause_x, controls_start_y + 60])
+        
+        # High scores - read from the stats store's cached leaderboard (no disk access here)
+        leaderboard = self.stats_store.leaderboard
+        if leaderboard:
+            scores_y = controls_start_y + 100
+            scores_text = controls_font.render("High Scores", True, BLACK)
+            screen.blit(scores_text, [screen_center_x - (scores_text.get_width() // 2), scores_y])
+            for rank, (score, session_number, duration, played_at) in enumerate(leaderboard, 1):
+                row_text = controls_font.render(f"{rank}. {score} points ({int(duration)}s)", True, BLACK)
+                screen.blit(row_text, [screen_center_x - (row_text.get_width() // 2), scores_y + rank * 18])
 
     def pause_screen(self, screen):
         # Display the pause screen overlay
         print('pause screen')
+        screen.blit(self.menu_panels['pause'].get(), (0, 0))
+
+    def build_pause_panel(self, screen):
+        # Draw the pause overlay and text onto the cached panel surface
         
-        # Create a semi-transparent overlay
-        overlay = pygame.Surface((SCREEN_SIZE[0], SCREEN_SIZE[1]))
-        overlay.set_alpha(128)  # Semi-transparent (0=transparent, 255=opaque)
-        overlay.fill(BLACK)     # Black overlay
-        screen.blit(overlay, (0, 0))
+        # Semi-transparent black overlay (alpha 128: 0=transparent, 255=opaque)
+        screen.fill((*BLACK, 128))
         
-        # Create fonts for different text sizes
-        pause_font = pygame.font.SysFont("serif", 50)    # Large font for "PAUSED"
-        instruction_font = pygame.font.SysFont("serif", 25)  # Medium font for instructions
+        # Get fonts for different text sizes
+        pause_font = self.get_font(50)        # Large font for "PAUSED"
+        instruction_font = self.get_font(25)  # Medium font for instructions
         
         # Render text surfaces with white color for visibility on dark overlay
         pause_text = pause_font.render("PAUSED", True, WHITE)
@@ -379,20 +994,33 @@ class Game(object):
 
     def user_debug_display(self, screen):
         # Display debug information in the top-left corner
-        info = pygame.font.SysFont("serif", 15)  # Small font for debug text
+        self.draw_hud(screen, self.get_hud_inputs(), self.get_font(15))  # Small font for debug text
+
+    def get_hud_inputs(self):
+        # Everything the debug display shows, as the text it's drawn from
+        return (str(clock.get_fps())[:2], str(self.session_number)[:2], str(self.score)[:2],
+                self.left_weapon_level, self.right_weapon_level, self.player_health)
+
+    def draw_hud(self, screen, inputs, info):
+        # Draw the debug display from get_hud_inputs() - reads no game state, so it can run on
+        # the layer pipeline's worker thread
+        fps, session_number, score, left_weapon_level, right_weapon_level, player_health = inputs
         
         # Display frames per second (FPS) - shows game performance
-        screen.blit(info.render("FPS: " + str(clock.get_fps())[:2], True, BLACK), [0, 0])
+        screen.blit(info.render("FPS: " + fps, True, BLACK), [0, 0])
         
         # Display session number - how many games have been played
-        screen.blit(info.render("S#: " + str(self.session_number)[:2], True, BLACK), [0, 15])
+        screen.blit(info.render("S#: " + session_number, True, BLACK), [0, 15])
         
         # Display current score
-        screen.blit(info.render("Score: " + str(self.score)[:2], True, BLACK), [0, 30])
+        screen.blit(info.render("Score: " + score, True, BLACK), [0, 30])
         
         # Display weapon levels
-        screen.blit(info.render("L.Gun: L" + str(self.left_weapon_level), True, BLACK), [0, 45])
-        screen.blit(info.render("R.Gun: L" + str(self.right_weapon_level), True, BLACK), [0, 60])
+        screen.blit(info.render("L.Gun: L" + str(left_weapon_level), True, BLACK), [0, 45])
+        screen.blit(info.render("R.Gun: L" + str(right_weapon_level), True, BLACK), [0, 60])
+        
+        # Display player health
+        screen.blit(info.render("HP: " + str(player_health), True, BLACK), [0, 75])
         
     def user_character(self, screen):
         # Display the player's character (aircraft) that follows the mouse
@@ -400,13 +1028,20 @@ class Game(object):
         # Get constrained mouse position
         mx, my = self.get_constrained_position()
     
-        # Load the aircraft image from the resources folder - use path relative to script location
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        file_path = os.path.join(script_dir, '..', 'res', 'aircrafts', 'images', 'aircraft_1.png')
-        alpha_image_surface = pygame.image.load(file_path).convert_alpha()  # Load with transparency
+        # Get the aircraft image (loaded once)
+        alpha_image_surface, _ = self.get_player_sprite()
         
-        # Draw the aircraft at the constrained position
-        screen.blit(alpha_image_surface, (mx, my))
+        # Draw the aircraft at the constrained position - blink while invulnerable after a hit
+        if self.player_invulnerable == 0 or (self.player_invulnerable // 6) % 2 == 0:
+            screen.blit(alpha_image_surface, (mx, my))
+            
+            # Draw the spinning propeller over the aircraft nose
+            self.propeller_clip.draw(screen, self.animation_tick, mx, my)
+        
+        # Draw the other players in a co-op session
+        for wingman_x, wingman_y in self.wingmen:
+            screen.blit(alpha_image_surface, (wingman_x, wingman_y))
+            self.propeller_clip.draw(screen, self.animation_tick, wingman_x, wingman_y)
         
         # Draw muzzle flash if firing
         if self.is_firing:
@@ -425,7 +1060,12 @@ class Game(object):
         # Draw enemies
         self.draw_enemies(screen)
 
-    def draw_clouds(self, screen):
+    def draw_background(self, screen, cloud_offset):
+        # Draw the blue sky with the clouds scrolled to cloud_offset
+        screen.fill(BLUE)
+        self.draw_clouds(screen, cloud_offset)
+
+    def draw_clouds(self, screen, cloud_offset):
         # Draw clouds with smooth scrolling animation
         # Use predefined cloud positions instead of random generation to avoid affecting other random calls
         
@@ -445,7 +1085,7 @@ class Game(object):
         # Draw enough cloud layers to cover screen + buffer
         for base_x, base_y in base_cloud_positions:
             # Calculate current position with smooth scrolling
-            current_y = (base_y + self.cloud_offset) % pattern_height
+            current_y = (base_y + cloud_offset) % pattern_height
             
             # Draw cloud if it's in or near the visible area
             if current_y > -100 and current_y < SCREEN_SIZE[1] + 100:
@@ -477,26 +1117,8 @@ class Game(object):
         screen.blit(cloud_surface, (x - 25, y - 30))
     
     def get_constrained_position(self):
-        # Get mouse position constrained to screen boundaries
-        mx, my = pygame.mouse.get_pos()
-        
-        # Load aircraft image to get dimensions (could be optimized by caching)
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        file_path = os.path.join(script_dir, '..', 'res', 'aircrafts', 'images', 'aircraft_1.png')
-        try:
-            alpha_image_surface = pygame.image.load(file_path).convert_alpha()
-            aircraft_width = alpha_image_surface.get_width()
-            aircraft_height = alpha_image_surface.get_height()
-        except:
-            # Fallback dimensions if image can't be loaded
-            aircraft_width = 50
-            aircraft_height = 50
-        
-        # Apply screen boundaries - keep aircraft fully within screen
-        mx = max(0, min(mx, SCREEN_SIZE[0] - aircraft_width))
-        my = max(0, min(my, SCREEN_SIZE[1] - aircraft_height))
-        
-        return mx, my
+        # Get mouse position constrained to screen boundaries, from this tick's input snapshot
+        return self.input.mouse_x, self.input.mouse_y
     
     def fire_weapon(self):
         # Fire a bullet if cooldown allows
@@ -504,15 +1126,16 @@ class Game(object):
             # Get constrained position for bullet spawn location
             mx, my = self.get_constrained_position()
             
-            # Create a new bullet (x, y, velocity_x, velocity_y)
-            # Bullets fire upward from the aircraft position
-            bullet = {
-                'x': mx + 25,  # Center of aircraft (assuming aircraft width ~50px)
-                'y': my,       # Top of aircraft
-                'speed': 8 + (self.left_weapon_level - 1) * 2  # Bullet speed increases with level
-            }
-            
-            self.bullets.append(bullet)
+            # Create a new bullet - bullets fire upward from the aircraft position
+            self.world.spawn(
+                self.bullets,
+                x=mx + 25,  # Center of aircraft (assuming aircraft width ~50px)
+                y=my,       # Top of aircraft
+                velocity_x=0.0,
+                velocity_y=-(8 + (self.left_weapon_level - 1) * 2),  # Bullet speed increases with level
+                radius=self.bullet_radius,
+                damage=1.5 + (self.left_weapon_level - 1) * 0.5,     # Damage increases with level
+                state=ACTIVE)
             
             # Start muzzle flash animation
             self.is_firing = True
@@ -524,22 +1147,6 @@ class Game(object):
             
             print(f"Fired bullet at ({mx}, {my})")
     
-    def update_bullets(self):
-        # Update bullet positions and remove bullets that are off-screen
-        bullets_to_remove = []
-        
-        for i, bullet in enumerate(self.bullets):
-            # Move bullet upward
-            bullet['y'] -= bullet['speed']
-            
-            # Remove bullets that have gone off the top of the screen
-            if bullet['y'] < -10:
-                bullets_to_remove.append(i)
-        
-        # Remove bullets in reverse order to maintain correct indices
-        for i in reversed(bullets_to_remove):
-            del self.bullets[i]
-    
     def update_muzzle_flash(self):
         # Update muzzle flash animation
         if self.is_firing:
@@ -551,35 +1158,21 @@ class Game(object):
                 self.muzzle_flash_frame = 0
     
     def draw_muzzle_flash(self, screen, aircraft_x, aircraft_y):
-        # Draw animated muzzle flash
-        if self.is_firing and self.muzzle_flash_frame < self.muzzle_flash_duration:
-            # Calculate which muzzle flash image to show
-            # We have 24 frames (0-23), cycle through them quickly
-            frame_index = (self.muzzle_flash_frame * 3) % 24  # Speed up animation
-            
-            # Load the muzzle flash image
-            script_dir = os.path.dirname(os.path.abspath(__file__))
-            muzzle_file = os.path.join(script_dir, '..', 'res', 'explosions', 'images', 'muzzle', f'muzzle2_{frame_index:04d}.png')
-            
-            try:
-                muzzle_surface = pygame.image.load(muzzle_file).convert_alpha()
-                
-                # Position muzzle flash at the front of the aircraft
-                muzzle_x = aircraft_x + 25 - (muzzle_surface.get_width() // 2)  # Center horizontally
-                muzzle_y = aircraft_y - 10  # Slightly ahead of aircraft
-                
-                screen.blit(muzzle_surface, (muzzle_x, muzzle_y))
-            except pygame.error:
-                # If image fails to load, draw a simple yellow circle as fallback
-                pygame.draw.circle(screen, (255, 255, 0), (aircraft_x + 25, aircraft_y), 10)
+        # Draw animated muzzle flash at the front of the aircraft
+        if self.is_firing:
+            self.muzzle_flash_clip.draw(screen, self.muzzle_flash_frame, aircraft_x, aircraft_y)
     
     def draw_bullets(self, screen):
-        # Draw all active bullets
-        for bullet in self.bullets:
-            # Draw bullet as a small yellow circle
-            pygame.draw.circle(screen, (255, 255, 0), (int(bullet['x']), int(bullet['y'])), 3)
-            # Add a white center for better visibility
-            pygame.draw.circle(screen, (255, 255, 255), (int(bullet['x']), int(bullet['y'])), 1)
+        # Draw all active bullets as small yellow circles with a white center for better visibility
+        self.render_projectiles(screen, self.bullets, (255, 255, 0), (255, 255, 255))
+    
+    def render_projectiles(self, screen, projectiles, color, center_color):
+        # Render system for projectiles - a filled circle plus a small center dot
+        xs, ys, radii = projectiles.x, projectiles.y, projectiles.radius
+        for row in projectiles.visible_rows:
+            position = (int(xs[row]), int(ys[row]))
+            pygame.draw.circle(screen, color, position, radii[row])
+            pygame.draw.circle(screen, center_color, position, radii[row] // 2)
     
     def fire_rocket(self):
         # Fire a rocket if cooldown allows
@@ -587,15 +1180,16 @@ class Game(object):
             # Get constrained position for rocket spawn location
             mx, my = self.get_constrained_position()
             
-            # Create a new rocket (x, y, velocity_x, velocity_y)
-            # Rockets fire upward from the aircraft position, larger and slower than bullets
-            rocket = {
-                'x': mx + 25,  # Center of aircraft (assuming aircraft width ~50px)
-                'y': my,       # Top of aircraft
-                'speed': 6 + (self.right_weapon_level - 1)  # Rocket speed increases with level
-            }
-            
-            self.rockets.append(rocket)
+            # Create a new rocket - rockets fire upward, larger and slower than bullets
+            self.world.spawn(
+                self.rockets,
+                x=mx + 25,  # Center of aircraft (assuming aircraft width ~50px)
+                y=my,       # Top of aircraft
+                velocity_x=0.0,
+                velocity_y=-(6 + (self.right_weapon_level - 1)),  # Rocket speed increases with level
+                radius=self.rocket_radius,
+                damage=2.0 + (self.right_weapon_level - 1) * 0.5,   # Damage increases with level
+                state=ACTIVE)
             
             # Start rocket flash animation
             self.is_rocket_firing = True
@@ -607,22 +1201,6 @@ class Game(object):
             
             print(f"Fired rocket at ({mx}, {my})")
     
-    def update_rockets(self):
-        # Update rocket positions and remove rockets that are off-screen
-        rockets_to_remove = []
-        
-        for i, rocket in enumerate(self.rockets):
-            # Move rocket upward
-            rocket['y'] -= rocket['speed']
-            
-            # Remove rockets that have gone off the top of the screen
-            if rocket['y'] < -10:
-                rockets_to_remove.append(i)
-        
-        # Remove rockets in reverse order to maintain correct indices
-        for i in reversed(rockets_to_remove):
-            del self.rockets[i]
-    
     def update_rocket_flash(self):
         # Update rocket flash animation
         if self.is_rocket_firing:
@@ -634,52 +1212,25 @@ class Game(object):
                 self.rocket_flash_frame = 0
     
     def draw_rocket_flash(self, screen, aircraft_x, aircraft_y):
-        # Draw animated rocket flame flash
-        if self.is_rocket_firing and self.rocket_flash_frame < self.rocket_flash_duration:
-            # Calculate which rocket flame image to show
-            # We have 16 frames (0-15), cycle through them quickly
-            frame_index = (self.rocket_flash_frame * 2) % 16  # Speed up animation
-            
-            # Load the rocket flame image
-            script_dir = os.path.dirname(os.path.abspath(__file__))
-            rocket_file = os.path.join(script_dir, '..', 'res', 'explosions', 'images', 'rocket_flame', f'rocket_1_{frame_index:04d}.png')
-            
-            try:
-                rocket_surface = pygame.image.load(rocket_file).convert_alpha()
-                
-                # Position rocket flame at the front of the aircraft
-                rocket_x = aircraft_x + 25 - (rocket_surface.get_width() // 2)  # Center horizontally
-                rocket_y = aircraft_y - 15  # Slightly ahead of aircraft
-                
-                screen.blit(rocket_surface, (rocket_x, rocket_y))
-            except pygame.error:
-                # If image fails to load, draw a simple orange circle as fallback
-                pygame.draw.circle(screen, (255, 165, 0), (aircraft_x + 25, aircraft_y), 12)
+        # Draw animated rocket flame flash at the front of the aircraft
+        if self.is_rocket_firing:
+            self.rocket_flash_clip.draw(screen, self.rocket_flash_frame, aircraft_x, aircraft_y)
     
     def draw_rockets(self, screen):
-        # Draw all active rockets
-        for rocket in self.rockets:
-            # Draw rocket as a larger orange circle with red center
-            pygame.draw.circle(screen, (255, 165, 0), (int(rocket['x']), int(rocket['y'])), 5)
-            # Add a red center for better visibility
-            pygame.draw.circle(screen, (255, 0, 0), (int(rocket['x']), int(rocket['y'])), 2)
+        # Draw all active rockets as larger orange circles with a red center
+        self.render_projectiles(screen, self.rockets, (255, 165, 0), (255, 0, 0))
     
     def spawn_enemies(self):
         # Spawn new enemies if we have fewer than max and cooldown allows
         if len(self.enemies) < self.max_enemies and self.enemy_spawn_cooldown <= 0:
             # Choose a random enemy sprite
-            sprite_name = random.choice(self.enemy_sprites)
+            sprite_id = random.randrange(len(self.enemy_sprites))
+            sprite_name = self.enemy_sprites[sprite_id]
             
-            # Calculate enemy size (10% bigger than player)
-            try:
-                script_dir = os.path.dirname(os.path.abspath(__file__))
-                player_file = os.path.join(script_dir, '..', 'res', 'aircrafts', 'images', 'aircraft_1.png')
-                player_surface = pygame.image.load(player_file).convert_alpha()
-                enemy_width = int(player_surface.get_width() * 1.1)
-                enemy_height = int(player_surface.get_height() * 1.1)
-            except:
-                enemy_width = int(50 * 1.1)  # Fallback: 55px
-                enemy_height = int(50 * 1.1)  # Fallback: 55px
+            # Get the scaled sprite size (10% bigger than player)
+            enemy_surface, _ = self.get_enemy_sprite(sprite_name)
+            enemy_width = enemy_surface.get_width()
+            enemy_height = enemy_surface.get_height()
             
             # Choose random spawn location (top, left, right only - no bottom spawning)
             spawn_side = random.choice(['top', 'left', 'right'])
@@ -706,227 +1257,312 @@ class Game(object):
                 velocity_y = random.uniform(-1.0, 1.0)  # Slight vertical drift
             
             # Create new enemy with velocity-based movement
-            enemy = {
-                'x': spawn_x,
-                'y': spawn_y,
-                'velocity_x': velocity_x,     # Horizontal movement speed
-                'velocity_y': velocity_y,     # Vertical movement speed
-                'sprite': sprite_name,
-                'surface': None,              # Will be loaded when first drawn
-                'health': self.enemy_health,  # Use configurable enemy health
-                'max_health': self.enemy_health # For visual health indication
-            }
-            
-            self.enemies.append(enemy)
+            self.world.spawn(
+                self.enemies,
+                x=spawn_x,
+                y=spawn_y,
+                velocity_x=velocity_x,        # Horizontal movement speed
+                velocity_y=velocity_y,        # Vertical movement speed
+                width=enemy_width,
+                height=enemy_height,
+                health=self.enemy_health,     # Use configurable enemy health
+                max_health=self.enemy_health, # For visual health indication
+                sprite=sprite_id,             # Surface and mask are shared per sprite
+                state=SPAWNING)               # Flies in, then becomes ACTIVE (see enemy_lifecycle_system)
             
             # Set spawn cooldown
             self.enemy_spawn_cooldown = self.enemy_spawn_rate
             
             print(f"Spawned enemy {sprite_name} at ({spawn_x}, {spawn_y}) from {spawn_side}")
     
-    def update_enemies(self):
-        # Update enemy positions and bounce them back when they hit screen boundaries
-        enemies_to_remove = []
-        
-        for i, enemy in enumerate(self.enemies):
-            # Move enemy based on velocity
-            enemy['x'] += enemy['velocity_x']
-            enemy['y'] += enemy['velocity_y']
-            
-            # Get enemy dimensions for boundary checking
-            if enemy['surface']:
-                enemy_width = enemy['surface'].get_width()
-                enemy_height = enemy['surface'].get_height()
-            else:
-                enemy_width = int(50 * 1.1)  # Fallback size
-                enemy_height = int(50 * 1.1)
+    def movement_system(self, archetype):
+        # Move every entity of an archetype by its velocity
+        xs, ys = archetype.x, archetype.y
+        velocities_x, velocities_y = archetype.velocity_x, archetype.velocity_y
+        for row in range(len(archetype)):
+            xs[row] += velocities_x[row]
+            ys[row] += velocities_y[row]
+    
+    def lifecycle_stage(self):
+        # Move entities between lifecycle states, recycle the dead ones in one flush, then
+        # rebuild the row sets the render and collision systems iterate
+        self.projectile_lifecycle_system(self.bullets)
+        self.projectile_lifecycle_system(self.rockets)
+        self.enemy_lifecycle_system()
+        self.world.flush()
+        
+        for projectiles in (self.bullets, self.rockets):
+            rows = list(range(len(projectiles)))  # Every projectile left after the flush is on screen
+            projectiles.visible_rows[:] = rows
+            projectiles.active_rows[:] = rows
+        
+        enemies = self.enemies
+        states, xs, ys = enemies.state, enemies.x, enemies.y
+        widths, heights = enemies.width, enemies.height
+        visible_rows = enemies.visible_rows
+        active_rows = enemies.active_rows
+        del visible_rows[:]
+        del active_rows[:]
+        for row in range(len(enemies)):
+            if states[row] == ACTIVE:
+                visible_rows.append(row)
+                active_rows.append(row)
+            elif (states[row] == SPAWNING and xs[row] < SCREEN_SIZE[0] and ys[row] < SCREEN_SIZE[1] and
+                    xs[row] + widths[row] > 0 and ys[row] + heights[row] > 0):
+                visible_rows.append(row)  # Partly on screen while flying in
+    
+    def projectile_lifecycle_system(self, projectiles):
+        # Projectiles are only ever ACTIVE - once off screen they're dead
+        xs, ys, radii, ids = projectiles.x, projectiles.y, projectiles.radius, projectiles.ids
+        for row in range(len(projectiles)):
+            radius = radii[row]
+            if (ys[row] + radius < 0 or ys[row] - radius > SCREEN_SIZE[1] or
+                    xs[row] + radius < 0 or xs[row] - radius > SCREEN_SIZE[0]):
+                projectiles.destroy(ids[row])
+    
+    def enemy_lifecycle_system(self):
+        # Activate enemies that have flown fully onto the screen - only ACTIVE enemies are in the
+        # spatial index, and bounce_system keeps them on screen from then on
+        enemies = self.enemies
+        states, xs, ys = enemies.state, enemies.x, enemies.y
+        widths, heights, ids = enemies.width, enemies.height, enemies.ids
+        for row in range(len(enemies)):
+            if states[row] == SPAWNING:
+                x, y, width, height = xs[row], ys[row], widths[row], heights[row]
+                if x >= 0 and y >= 0 and x + width <= SCREEN_SIZE[0] and y + height <= SCREEN_SIZE[1]:
+                    states[row] = ACTIVE
+                    self.enemy_grid.insert(ids[row], x, y, width, height)
+    
+    def bounce_system(self):
+        # Bounce enemies back when they hit screen boundaries and keep the spatial index in step
+        # Spawning enemies aren't bounced back off the edge they're flying in through
+        enemies = self.enemies
+        xs, ys, states = enemies.x, enemies.y, enemies.state
+        velocities_x, velocities_y = enemies.velocity_x, enemies.velocity_y
+        widths, heights, ids = enemies.width, enemies.height, enemies.ids
+        
+        for row in range(len(enemies)):
+            enemy_width = widths[row]
+            enemy_height = heights[row]
+            entering = states[row] == SPAWNING
             
             # Bounce off screen boundaries instead of removing enemies
             bounced = False
             
             # Left boundary - bounce right
-            if enemy['x'] < 0:
-                enemy['x'] = 0
-                enemy['velocity_x'] = abs(enemy['velocity_x'])  # Make velocity positive (rightward)
+            if xs[row] < 0 and not (entering and velocities_x[row] > 0):
+                xs[row] = 0
+                velocities_x[row] = abs(velocities_x[row])  # Make velocity positive (rightward)
                 bounced = True
             
             # Right boundary - bounce left
-            elif enemy['x'] + enemy_width > SCREEN_SIZE[0]:
-                enemy['x'] = SCREEN_SIZE[0] - enemy_width
-                enemy['velocity_x'] = -abs(enemy['velocity_x'])  # Make velocity negative (leftward)
+            elif xs[row] + enemy_width > SCREEN_SIZE[0] and not (entering and velocities_x[row] < 0):
+                xs[row] = SCREEN_SIZE[0] - enemy_width
+                velocities_x[row] = -abs(velocities_x[row])  # Make velocity negative (leftward)
                 bounced = True
             
             # Top boundary - bounce down
-            if enemy['y'] < 0:
-                enemy['y'] = 0
-                enemy['velocity_y'] = abs(enemy['velocity_y'])  # Make velocity positive (downward)
+            if ys[row] < 0 and not (entering and velocities_y[row] > 0):
+                ys[row] = 0
+                velocities_y[row] = abs(velocities_y[row])  # Make velocity positive (downward)
                 bounced = True
             
             # Bottom boundary - bounce up
-            elif enemy['y'] + enemy_height > SCREEN_SIZE[1]:
-                enemy['y'] = SCREEN_SIZE[1] - enemy_height
-                enemy['velocity_y'] = -abs(enemy['velocity_y'])  # Make velocity negative (upward)
+            elif ys[row] + enemy_height > SCREEN_SIZE[1] and not (entering and velocities_y[row] < 0):
+                ys[row] = SCREEN_SIZE[1] - enemy_height
+                velocities_y[row] = -abs(velocities_y[row])  # Make velocity negative (upward)
                 bounced = True
             
             # Add some randomness to bounced enemies to make movement more interesting
             if bounced:
-                # Slightly randomize velocity to prevent predictable patterns
-                enemy['velocity_x'] += random.uniform(-0.5, 0.5)
-                enemy['velocity_y'] += random.uniform(-0.5, 0.5)
-                
-                # Clamp velocities to reasonable ranges
-                enemy['velocity_x'] = max(-3.0, min(3.0, enemy['velocity_x']))
-                enemy['velocity_y'] = max(-3.0, min(3.0, enemy['velocity_y']))
+                # Slightly randomize velocity to prevent predictable patterns, clamped to reasonable ranges
+                velocities_x[row] = max(-3.0, min(3.0, velocities_x[row] + random.uniform(-0.5, 0.5)))
+                velocities_y[row] = max(-3.0, min(3.0, velocities_y[row] + random.uniform(-0.5, 0.5)))
+            
+            # Keep the spatial index in step with the new position
+            if states[row] == ACTIVE:
+                self.enemy_grid.update(ids[row], xs[row], ys[row], enemy_width, enemy_height)
         
-        # Note: No enemies are removed - they all bounce and stay active
-        # Only remove enemies if they are destroyed by weapons in collision detection methods
+        # Note: No enemies are removed here - they all bounce and stay active
+        # Enemies are removed when destroyed by weapons or by colliding with the player
     
     def draw_enemies(self, screen):
-        # Draw all active enemies
-        for enemy in self.enemies:
-            # Load enemy sprite if not already loaded
-            if enemy['surface'] is None:
-                script_dir = os.path.dirname(os.path.abspath(__file__))
-                sprite_file = os.path.join(script_dir, '..', 'res', 'SpaceShipsPack', enemy["sprite"])
-                
-                try:
-                    original_surface = pygame.image.load(sprite_file).convert_alpha()
-                    
-                    # Get player character dimensions for scaling reference
-                    player_file = os.path.join(script_dir, '..', 'res', 'aircrafts', 'images', 'aircraft_1.png')
-                    try:
-                        player_surface = pygame.image.load(player_file).convert_alpha()
-                        player_width = player_surface.get_width()
-                        player_height = player_surface.get_height()
-                    except:
-                        # Fallback player dimensions
-                        player_width = 50
-                        player_height = 50
-                    
-                    # Calculate enemy size: 10% bigger than player character
-                    target_width = int(player_width * 1.1)
-                    target_height = int(player_height * 1.1)
-                    
-                    # Scale the enemy sprite
-                    enemy['surface'] = pygame.transform.scale(original_surface, (target_width, target_height))
-                    
-                except pygame.error:
-                    # If image fails to load, create a simple red rectangle as fallback
-                    # Make it 10% bigger than default player size
-                    fallback_width = int(50 * 1.1)  # 55px
-                    fallback_height = int(50 * 1.1)  # 55px
-                    enemy['surface'] = pygame.Surface((fallback_width, fallback_height))
-                    enemy['surface'].fill((255, 0, 0))  # Red color
-            
+        # Render system for enemies - sprite plus a health bar once damaged
+        enemies = self.enemies
+        xs, ys, sprites = enemies.x, enemies.y, enemies.sprite
+        healths, max_healths = enemies.health, enemies.max_health
+        for row in enemies.visible_rows:
             # Draw the enemy sprite
-            screen.blit(enemy['surface'], (int(enemy['x']), int(enemy['y'])))
+            enemy_surface, _ = self.get_enemy_sprite(self.enemy_sprites[sprites[row]])
+            screen.blit(enemy_surface, (int(xs[row]), int(ys[row])))
             
             # Draw health indicator if enemy is damaged
-            if enemy['health'] < enemy['max_health']:
-                self.draw_enemy_health(screen, enemy)
+            if healths[row] < max_healths[row]:
+                self.draw_enemy_health(screen, row)
+    
+    def get_player_sprite(self):
+        # Get the player surface and its collision mask, loaded once
+        if self.player_sprite is None:
+            try:
+                player_surface = load_image(*PLAYER_SPRITE)
+            except (pygame.error, FileNotFoundError):
+                # Fallback player dimensions
+                player_surface = pygame.Surface((50, 50))
+            self.player_sprite = (player_surface, pygame.mask.from_surface(player_surface))
+        return self.player_sprite
     
-    def draw_enemy_health(self, screen, enemy):
-        # Draw a health bar above the enemy
+    def warm_up_assets(self):
+        # Load and scale one enemy sprite that isn't cached yet - returns True while more remain
+        for sprite_name in self.enemy_sprites:
+            if sprite_name not in self.enemy_sprite_cache:
+                self.get_enemy_sprite(sprite_name)
+                return True
+        return False
+    
+    def get_enemy_sprite(self, sprite_name):
+        # Get the scaled enemy sprite and its collision mask, loaded and cached once per sprite name
+        if sprite_name not in self.enemy_sprite_cache:
+            # Get player character dimensions for scaling reference
+            player_surface, _ = self.get_player_sprite()
+            player_width = player_surface.get_width()
+            player_height = player_surface.get_height()
+            
+            # Calculate enemy size: 10% bigger than player character
+            target_width = int(player_width * 1.1)
+            target_height = int(player_height * 1.1)
+            
+            try:
+                original_surface = load_image('SpaceShipsPack', sprite_name)
+                
+                # Scale the enemy sprite
+                enemy_surface = pygame.transform.scale(original_surface, (target_width, target_height))
+                
+            except (pygame.error, FileNotFoundError):
+                # If image fails to load, create a simple red rectangle as fallback
+                enemy_surface = pygame.Surface((target_width, target_height))
+                enemy_surface.fill((255, 0, 0))  # Red color
+            
+            # Pixel mask of the opaque part of the sprite (a fallback rectangle is fully solid)
+            enemy_mask = pygame.mask.from_surface(enemy_surface)
+            self.enemy_sprite_cache[sprite_name] = (enemy_surface, enemy_mask)
+        
+        return self.enemy_sprite_cache[sprite_name]
+    
+    def draw_enemy_health(self, screen, row):
+        # Draw a health bar above the enemy in the given row
+        enemies = self.enemies
         bar_width = 40
         bar_height = 4
-        bar_x = int(enemy['x'] + (enemy['surface'].get_width() - bar_width) // 2)
-        bar_y = int(enemy['y'] - 8)
+        bar_x = int(enemies.x[row] + (enemies.width[row] - bar_width) // 2)
+        bar_y = int(enemies.y[row] - 8)
         
         # Background (red)
         pygame.draw.rect(screen, (255, 0, 0), (bar_x, bar_y, bar_width, bar_height))
         
         # Health (green)
-        health_percentage = enemy['health'] / enemy['max_health']
+        health_percentage = enemies.health[row] / enemies.max_health[row]
         health_width = int(bar_width * health_percentage)
         pygame.draw.rect(screen, (0, 255, 0), (bar_x, bar_y, health_width, bar_height))
     
-    def check_bullet_enemy_collisions(self):
-        # Check collisions between bullets and enemies
-        bullets_to_remove = []
-        enemies_to_remove = []
-        
-        for bullet_idx, bullet in enumerate(self.bullets):
-            for enemy_idx, enemy in enumerate(self.enemies):
-                if self.check_collision(bullet, enemy):
-                    # Bullet hit enemy
-                    bullets_to_remove.append(bullet_idx)
-                    # Damage increases with weapon level
-                    damage = 1.5 + (self.left_weapon_level - 1) * 0.5
-                    enemy['health'] -= damage
-                    
-                    print(f"Enemy hit! Health: {enemy['health']} (Damage: {damage})")
-                    
-                    # Check if enemy is destroyed
-                    if enemy['health'] <= 0:
-                        enemies_to_remove.append(enemy_idx)
-                        self.score += 10  # Award points for destroying enemy
-                        print(f"Enemy destroyed! Score: {self.score}")
-                    
-                    break  # Bullet can only hit one enemy
-        
-        # Remove bullets that hit enemies (in reverse order)
-        for idx in reversed(bullets_to_remove):
-            if idx < len(self.bullets):
-                del self.bullets[idx]
-        
-        # Remove destroyed enemies (in reverse order)
-        for idx in reversed(enemies_to_remove):
-            if idx < len(self.enemies):
-                del self.enemies[idx]
+    def projectile_collision_system(self, projectiles, weapon):
+        # Find projectile-enemy hits - a projectile hits at most one enemy and is destroyed,
+        # its damage is queued for damage_system
+        xs, ys, radii = projectiles.x, projectiles.y, projectiles.radius
+        damages, ids = projectiles.damage, projectiles.ids
+        enemy_rows = self.enemies.rows
+        
+        for row in projectiles.active_rows:
+            radius = radii[row]
+            x = xs[row]
+            y = ys[row]
+            # Only enemies sharing a grid cell with the projectile need a precise test
+            for enemy_id in self.enemy_grid.query(x - radius, y - radius, radius * 2, radius * 2):
+                if self.check_collision(x, y, radius, enemy_rows[enemy_id]):
+                    self.pending_hits.append((enemy_id, damages[row], weapon))
+                    projectiles.destroy(ids[row])
+                    break  # Projectile can only hit one enemy
     
-    def check_rocket_enemy_collisions(self):
-        # Check collisions between rockets and enemies
-        rockets_to_remove = []
-        enemies_to_remove = []
-        
-        for rocket_idx, rocket in enumerate(self.rockets):
-            for enemy_idx, enemy in enumerate(self.enemies):
-                if self.check_collision(rocket, enemy):
-                    # Rocket hit enemy
-                    rockets_to_remove.append(rocket_idx)
-                    # Damage increases with weapon level
-                    damage = 2.0 + (self.right_weapon_level - 1) * 0.5
-                    enemy['health'] -= damage
-                    
-                    print(f"Enemy hit by rocket! Health: {enemy['health']} (Damage: {damage})")
-                    
-                    # Check if enemy is destroyed
-                    if enemy['health'] <= 0:
-                        enemies_to_remove.append(enemy_idx)
-                        self.score += 15  # More points for rocket kills
-                        print(f"Enemy destroyed by rocket! Score: {self.score}")
-                    
-                    break  # Rocket can only hit one enemy
-        
-        # Remove rockets that hit enemies (in reverse order)
-        for idx in reversed(rockets_to_remove):
-            if idx < len(self.rockets):
-                del self.rockets[idx]
-        
-        # Remove destroyed enemies (in reverse order)
-        for idx in reversed(enemies_to_remove):
-            if idx < len(self.enemies):
-                del self.enemies[idx]
+    def damage_system(self):
+        # Apply the hits found this frame - destroy enemies that run out of health and award points
+        enemies = self.enemies
+        for enemy_id, damage, weapon in self.pending_hits:
+            if not enemies.is_alive(enemy_id):
+                continue  # Already destroyed by an earlier hit this frame
+            
+            row = enemies.rows[enemy_id]
+            enemies.health[row] -= damage
+            print(f"Enemy hit by {weapon}! Health: {enemies.health[row]} (Damage: {damage})")
+            
+            # Check if enemy is destroyed
+            if enemies.health[row] <= 0:
+                self.destroy_enemy(enemy_id)
+                self.score += self.kill_points[weapon]  # Award points for destroying enemy
+                self.session_points += self.kill_points[weapon]
+                self.session_kills[weapon] += 1
+                print(f"Enemy destroyed by {weapon}! Score: {self.score}")
+        
+        self.pending_hits = []
     
-    def check_collision(self, projectile, enemy):
-        # Check if a projectile collides with an enemy
-        # Simple rectangular collision detection
-        projectile_radius = 5  # Approximate projectile size
-        
-        # Get enemy dimensions
-        if enemy['surface']:
-            enemy_width = enemy['surface'].get_width()
-            enemy_height = enemy['surface'].get_height()
-        else:
-            # Fallback size (10% bigger than default player size)
-            enemy_width = int(50 * 1.1)  # 55px
-            enemy_height = int(50 * 1.1)  # 55px
+    def player_collision_system(self):
+        # Check contact between the player and nearby enemies - each contact costs one health
+        if self.player_invulnerable > 0:
+            return  # Still recovering from the last hit
         
-        # Check if projectile is within enemy bounds
-        return (projectile['x'] >= enemy['x'] and 
-                projectile['x'] <= enemy['x'] + enemy_width and
-                projectile['y'] >= enemy['y'] and 
-                projectile['y'] <= enemy['y'] + enemy_height)
+        mx, my = self.get_constrained_position()
+        player_surface, player_mask = self.get_player_sprite()
+        player_width, player_height = player_mask.get_size()
+        enemies = self.enemies
+        
+        # Only enemies sharing a grid cell with the player need a precise test
+        for enemy_id in self.enemy_grid.query(mx, my, player_width, player_height):
+            row = enemies.rows[enemy_id]
+            enemy_x = int(enemies.x[row])
+            enemy_y = int(enemies.y[row])
+            
+            # Bounding-box test first, then pixel-perfect mask test
+            if (mx > enemy_x + enemies.width[row] or mx + player_width < enemy_x or
+                    my > enemy_y + enemies.height[row] or my + player_height < enemy_y):
+                continue
+            _, enemy_mask = self.get_enemy_sprite(self.enemy_sprites[enemies.sprite[row]])
+            if player_mask.overlap(enemy_mask, (enemy_x - mx, enemy_y - my)) is None:
+                continue
+            
+            # Contact - the enemy is destroyed (no points) and the player takes damage
+            self.destroy_enemy(enemy_id)
+            self.player_health -= 1
+            self.player_invulnerable = self.player_invulnerable_duration
+            print(f"Player hit! Health: {self.player_health}")
+            
+            if self.player_health <= 0:
+                print("Lose Game!")
+                self.end_session()        # End the current game
+            break  # Only one hit per invulnerability window
+    
+    def destroy_enemy(self, enemy_id):
+        # Remove an enemy from the spatial index and mark it for removal at the end of the frame
+        self.enemy_grid.remove(enemy_id)
+        self.enemies.destroy(enemy_id)
+    
+    def check_collision(self, x, y, radius, enemy_row):
+        # Check if a round projectile at (x, y) collides with the enemy in the given row
+        # Cheap bounding-box test first, pixel-perfect mask test only when the boxes overlap
+        enemies = self.enemies
+        projectile_x = int(x) - radius  # Top-left of the projectile mask
+        projectile_y = int(y) - radius
+        enemy_x = int(enemies.x[enemy_row])
+        enemy_y = int(enemies.y[enemy_row])
+        
+        # Broadphase - reject if the bounding boxes don't overlap
+        if (projectile_x > enemy_x + enemies.width[enemy_row] or
+                projectile_x + radius * 2 < enemy_x or
+                projectile_y > enemy_y + enemies.height[enemy_row] or
+                projectile_y + radius * 2 < enemy_y):
+            return False
+        
+        # Narrowphase - only opaque sprite pixels count as a hit, not transparent corners
+        _, enemy_mask = self.get_enemy_sprite(self.enemy_sprites[enemies.sprite[enemy_row]])
+        offset = (projectile_x - enemy_x, projectile_y - enemy_y)
+        return enemy_mask.overlap(self.projectile_masks[radius], offset) is not None
 
     def check_upgrade_availability(self):
         # Check if player has enough points for an upgrade
@@ -938,25 +1574,34 @@ class Game(object):
         # Display the upgrade selection screen
         print('upgrade screen')
         
-        # Create a semi-transparent overlay
-        overlay = pygame.Surface((SCREEN_SIZE[0], SCREEN_SIZE[1]))
-        overlay.set_alpha(128)  # Semi-transparent
-        overlay.fill(BLACK)     # Black overlay
-        screen.blit(overlay, (0, 0))
+        # Rebuilt only when the score, weapon levels or costs change
+        inputs = (self.score, self.left_weapon_level, self.right_weapon_level,
+                  self.get_upgrade_cost(self.left_weapon_level), self.get_upgrade_cost(self.right_weapon_level))
+        screen.blit(self.menu_panels['upgrade'].get(inputs), (0, 0))
+
+    def build_upgrade_panel(self, screen):
+        # Draw the upgrade overlay and options onto the cached panel surface
+        
+        # Semi-transparent black overlay
+        screen.fill((*BLACK, 128))
         
-        # Create fonts
-        title_font = pygame.font.SysFont("serif", 40)
-        option_font = pygame.font.SysFont("serif", 25)
-        info_font = pygame.font.SysFont("serif", 18)
+        # Get fonts
+        title_font = self.get_font(40)
+        option_font = self.get_font(25)
+        info_font = self.get_font(18)
         
         # Calculate upgrade costs
         left_cost = self.get_upgrade_cost(self.left_weapon_level)
         right_cost = self.get_upgrade_cost(self.right_weapon_level)
         
-        # Render text
+        # Option colors - gray if the upgrade can't be afforded
+        left_color = WHITE if self.score >= left_cost else (128, 128, 128)
+        right_color = WHITE if self.score >= right_cost else (128, 128, 128)
+        
+        # Render text (each string once)
         title_text = title_font.render("WEAPON UPGRADE", True, WHITE)
-        left_option = option_font.render(f"1 - Upgrade Left Gun (Level {self.left_weapon_level})", True, WHITE)
-        right_option = option_font.render(f"2 - Upgrade Right Gun (Level {self.right_weapon_level})", True, WHITE)
+        left_option = option_font.render(f"1 - Upgrade Left Gun (Level {self.left_weapon_level})", True, left_color)
+        right_option = option_font.render(f"2 - Upgrade Right Gun (Level {self.right_weapon_level})", True, right_color)
         left_cost_text = info_font.render(f"Cost: {left_cost} points", True, WHITE)
         right_cost_text = info_font.render(f"Cost: {right_cost} points", True, WHITE)
         left_info = info_font.render("+ Speed, + Damage, + Fire Rate", True, WHITE)
@@ -980,9 +1625,7 @@ class Game(object):
         # Left weapon option
         left_x = screen_center_x - (left_option.get_width() // 2)
         left_y = score_y + score_text.get_height() + 30
-        color = WHITE if self.score >= left_cost else (128, 128, 128)  # Gray if can't afford
-        left_option_colored = option_font.render(f"1 - Upgrade Left Gun (Level {self.left_weapon_level})", True, color)
-        screen.blit(left_option_colored, [left_x, left_y])
+        screen.blit(left_option, [left_x, left_y])
         
         # Left weapon cost and info
         left_cost_x = screen_center_x - (left_cost_text.get_width() // 2)
@@ -993,9 +1636,7 @@ class Game(object):
         # Right weapon option
         right_x = screen_center_x - (right_option.get_width() // 2)
         right_y = left_y + 90
-        color = WHITE if self.score >= right_cost else (128, 128, 128)  # Gray if can't afford
-        right_option_colored = option_font.render(f"2 - Upgrade Right Gun (Level {self.right_weapon_level})", True, color)
-        screen.blit(right_option_colored, [right_x, right_y])
+        screen.blit(right_option, [right_x, right_y])
         
         # Right weapon cost and info
         right_cost_x = screen_center_x - (right_cost_text.get_width() // 2)
@@ -1004,15 +1645,59 @@ class Game(object):
         screen.blit(right_info, [right_info_x, right_y + 45])
 
     def get_upgrade_cost(self, current_level):
-        # Calculate upgrade cost based on current level
-        if current_level == 1:
-            return 200
-        elif current_level == 2:
-            return 300
-        elif current_level == 3:
-            return 400
-        else:
-            return 500 + (current_level - 4) * 100  # Exponential cost increase
+        # Calculate upgrade cost based on current level (cost table from the tuning data)
+        costs = self.upgrade_costs
+        if current_level <= len(costs):
+            return costs[current_level - 1]
+        return costs[-1] + (current_level - len(costs)) * self.upgrade_cost_step
+
+    def apply_tuning(self, values):
+        # Apply balance values and sprite lists, keeping live enemies on the sprite they were drawn with
+        self.fire_rate = values['fire_rate']
+        self.rocket_fire_rate = values['rocket_fire_rate']
+        self.enemy_spawn_rate = values['enemy_spawn_rate']
+        self.enemy_health = values['enemy_health']          # Used for enemies spawned from now on
+        self.upgrade_costs = list(values['upgrade_costs'])
+        self.upgrade_cost_step = values['upgrade_cost_step']
+
+        old_sprites = self.enemy_sprites
+        new_sprites = list(values['enemy_sprites'])
+        if new_sprites != old_sprites:
+            # Re-point enemy sprite ids at the new list (sprites that were removed fall back to the first)
+            new_ids = {name: sprite_id for sprite_id, name in enumerate(new_sprites)}
+            sprites = self.enemies.sprite
+            for row in range(len(sprites)):
+                sprites[row] = new_ids.get(old_sprites[sprites[row]], 0)
+            # Drop cached surfaces only for sprites that are no longer listed
+            for name in set(old_sprites) - set(new_sprites):
+                self.enemy_sprite_cache.pop(name, None)
+            self.enemy_sprites = new_sprites
+            # Saved snapshots hold sprite ids into the old list - they can't be restored any more
+            if self.quick_save_data is not None or self.rewind_buffer:
+                self.quick_save_data = None
+                self.rewind_buffer.clear()
+                print("Enemy sprite list changed - quick-save and rewind history cleared")
+
+        # Watch the player sprite and every listed enemy sprite for changes on disk
+        watched = {PLAYER_SPRITE: assets.source_paths(*PLAYER_SPRITE)}
+        for name in self.enemy_sprites:
+            watched[('SpaceShipsPack', name)] = assets.source_paths('SpaceShipsPack', name)
+        self.tuning.watch_assets(watched)
+
+    def poll_hot_reload(self):
+        # Apply tuning file changes and evict cached sprites whose files changed
+        values, changed_assets = self.tuning.poll()
+        if values is not None:
+            self.apply_tuning(values)
+            print("Tuning data reloaded")
+        for asset in changed_assets:
+            if asset == PLAYER_SPRITE:
+                # Enemy sprites are scaled to the player size, so they're rebuilt too
+                self.player_sprite = None
+                self.enemy_sprite_cache.clear()
+            else:
+                self.enemy_sprite_cache.pop(asset[-1], None)
+            print(f"Reloaded {os.path.join(*asset)}")
 
     def upgrade_left_weapon(self):
         # Upgrade left click weapon (bullets)
@@ -1022,6 +1707,7 @@ class Game(object):
             self.left_weapon_level += 1
             self.upgrade_available = False
             self.last_upgrade_score = self.score
+            self.record_upgrade('bullets', self.left_weapon_level)
             print(f"Left weapon upgraded to level {self.left_weapon_level}! Score: {self.score}")
         else:
             print("Not enough points for left weapon upgrade!")
@@ -1034,35 +1720,105 @@ class Game(object):
             self.right_weapon_level += 1
             self.upgrade_available = False
             self.last_upgrade_score = self.score
+            self.record_upgrade('rockets', self.right_weapon_level)
             print(f"Right weapon upgraded to level {self.right_weapon_level}! Score: {self.score}")
         else:
             print("Not enough points for right weapon upgrade!")
 
+    def record_upgrade(self, weapon, level):
+        # Add an upgrade to the current session's history
+        session_time = (pygame.time.get_ticks() - self.session_start_time) / 1000.0
+        self.session_upgrades.append((weapon, level, self.score, session_time))
+
     def run_main_loop(self):
         # Main game loop - runs the entire game
         import sys
         
+        # Low-priority work, run only when a frame finishes early
+        self.scheduler.defer('asset warm-up', self.warm_up_assets)
+        self.scheduler.every('log flush', sys.stdout.flush, 30)
+        if self.memory_profiler is None:
+            self.scheduler.manage_gc()  # Loading is done - freeze it and collect garbage between frames
+        else:
+            # Frozen objects are hidden from gc.get_objects(), which the profiler walks to count
+            # live Surfaces - keep automatic GC while profiling
+            print("Memory profiling - GC left automatic (no freeze)")
+        
         run_game = True
         while run_game:
+            self.scheduler.begin_frame()
+            
             # Process events and check if user wants to quit
             if self.process_events():
                 run_game = False
             
+            # Pick up edited tuning data and sprites
+            self.poll_hot_reload()
+            
             # Run game logic
             self.run_logic()
             
-            # Draw everything to screen
-            self.display_frame(screen)
+            # Draw everything to the logical screen surface
+            self.display_frame(self.presenter.surface)
             
-            # Control frame rate (60 FPS)
-            clock.tick(60)
-        
-        # Clean up and exit
+            # Sample memory usage every few frames when profiling
+            if self.memory_profiler is not None:
+                self.memory_profiler.tick()
+            
+            # Run deferred jobs if there's time left, then wait for the next frame (60 FPS)
+            self.scheduler.end_frame()
+        
+        # Clean up and exit - save the running session and wait for pending stats writes
+        self.end_session()
+        self.stats_store.close()
+        self.stop_recording()
+        if self.memory_profiler is not None:
+            self.memory_profiler.close()
+        self.stop_layer_pipeline()
+        self.scheduler.report()
         pygame.quit()
         sys.exit()
         
 # Create a game instance and run the main loop
 if __name__ == "__main__":
-    game = Game(0, 0)  # Create a single game instance with default score and session number
+    import argparse
+    
+    # Window options - the game always runs at SCREEN_SIZE and is scaled to the window
+    parser = argparse.ArgumentParser(description='PyShoot')
+    parser.add_argument('--window', default=f'{SCREEN_SIZE[0]}x{SCREEN_SIZE[1]}',
+                        help='window size as WIDTHxHEIGHT (default: %(default)s)')
+    parser.add_argument('--fullscreen', action='store_true', help='run fullscreen')
+    parser.add_argument('--scale', default='auto', choices=['auto', 'direct', 'scaled', 'integer', 'smooth'],
+                        help='how the game is scaled to the window; scaled lets SDL choose the window size '
+                             'and ignores --window (default: %(default)s)')
+    parser.add_argument('--record', metavar='FOLDER', help='record every frame to FOLDER from the start (F12 toggles)')
+    parser.add_argument('--record-format', default='raw', choices=['raw', 'png'],
+                        help='recording format (default: %(default)s)')
+    parser.add_argument('--profile-memory', metavar='REPORT',
+                        help='trace allocations and write a memory diff report to REPORT on exit')
+    parser.add_argument('--profile-interval', type=int, default=600,
+                        help='frames between memory samples (default: %(default)s)')
+    parser.add_argument('--pacing', default='hybrid', choices=['hybrid', 'busy', 'sleep'],
+                        help='how frames are paced to 60 FPS (default: %(default)s)')
+    parser.add_argument('--pipelined-render', action='store_true',
+                        help='draw the background and HUD for the next frame on a worker thread')
+    parser.add_argument('--assets', default='auto', choices=['auto', 'zip', 'dir'],
+                        help='read assets from the zip archives, the extracted folders or both (default: %(default)s)')
+    args = parser.parse_args()
+    if args.assets != assets.source:
+        assets.close()
+        assets = AssetFS(RES_DIR, args.assets)
+    window_size = tuple(int(value) for value in args.window.lower().split('x'))
+    
+    presenter = Presenter(window_size, args.fullscreen, args.scale)
+    game = Game(0, 0, presenter=presenter)  # Create a single game instance with default score and session number
+    game.record_format = args.record_format
+    game.scheduler = FrameScheduler(clock, 60, args.pacing)
+    if args.record:
+        game.start_recording(args.record, args.record_format)
+    if args.pipelined_render:
+        game.start_layer_pipeline()
+    if args.profile_memory:
+        game.memory_profiler = MemoryProfiler(Game, args.profile_memory, args.profile_interval)
     game.run_main_loop()  # Run the main game loop
     
\ No newline at end of file
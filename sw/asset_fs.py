@@ -0,0 +1,193 @@
+# asset_fs.py
+
+import mmap
+import os
+import struct
+import time
+import zlib
+
+# Zip record layouts (see the .ZIP APPNOTE) - only what's needed to find and read members
+END_OF_DIRECTORY = struct.Struct('<4sHHHHIIH')       # End of central directory record
+DIRECTORY_ENTRY = struct.Struct('<4sHHHHHHIIIHHHHHII')  # Central directory file header
+LOCAL_HEADER = struct.Struct('<4sHHHHHIIIHH')         # Local file header
+END_OF_DIRECTORY_SIGNATURE = b'PK\x05\x06'
+DIRECTORY_ENTRY_SIGNATURE = b'PK\x01\x02'
+LOCAL_HEADER_SIGNATURE = b'PK\x03\x04'
+MAX_COMMENT = 0xffff                                  # Longest possible archive comment
+
+# Compression methods that can be read
+STORED = 0
+DEFLATED = 8
+
+class ZipArchive(object):
+    # Read-only zip archive backed by a memory map
+    # The central directory is indexed once straight from the map, and members are
+    # decompressed from slices of it - no file is opened or seeked per member
+    # If the file changes, call reopen() before reading from it again: the map and index
+    # describe the file as it was opened, and a file rewritten in place under a live map
+    # can't be read safely (replace archives with a rename where possible)
+    def __init__(self, path):
+        self.path = path      # Archive file
+        self.data = None      # Memory map of the file
+        self.index = {}       # Member name -> (local header offset, compressed size, size, method, crc)
+        self.stamp = None     # (modification time, size) of the file when it was opened
+        self.opened_at = 0    # time.time() when the file was opened
+        self.open()
+
+    def open(self):
+        # Map the archive file and index its members
+        # Raises OSError if the file can't be opened, ValueError if it's not a supported zip archive
+        with open(self.path, 'rb') as archive_file:
+            stat = os.fstat(archive_file.fileno())
+            self.stamp = (stat.st_mtime_ns, stat.st_size)
+            self.opened_at = time.time()
+            self.data = mmap.mmap(archive_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.index = {}
+        self.read_index()
+
+    def changed(self):
+        # Check whether the file on disk is no longer the one that was opened
+        return get_stamp(self.path) != self.stamp
+
+    def reopen(self):
+        # Map the archive again after the file changed
+        # An archive that can't be read (e.g. while it's being written) serves no members
+        # until it changes again
+        self.close()
+        try:
+            self.open()
+        except (OSError, ValueError) as error:
+            print(f"Could not re-open {self.path}: {error}")
+            self.close()
+            self.index = {}
+            self.stamp = get_stamp(self.path)
+            self.opened_at = time.time()
+
+    def read_index(self):
+        # Find the end of central directory record and index every member
+        # Raises ValueError if the file is not a zip archive this reader supports
+        data = self.data
+        search_start = max(0, len(data) - END_OF_DIRECTORY.size - MAX_COMMENT)
+        end = data.rfind(END_OF_DIRECTORY_SIGNATURE, search_start)
+        if end < 0:
+            raise ValueError(f"{self.path} is not a zip archive")
+        (_, _, _, _, entry_count, _, offset, _) = END_OF_DIRECTORY.unpack_from(data, end)
+        if offset == 0xffffffff:
+            raise ValueError(f"{self.path} is a zip64 archive, which is not supported")
+
+        for _ in range(entry_count):
+            (signature, _, _, flags, method, _, _, crc, compressed_size, size,
+             name_length, extra_length, comment_length, _, _, _, header_offset) = DIRECTORY_ENTRY.unpack_from(data, offset)
+            if signature != DIRECTORY_ENTRY_SIGNATURE:
+                raise ValueError(f"{self.path} has a damaged central directory")
+            offset += DIRECTORY_ENTRY.size
+            name = data[offset:offset + name_length].decode('utf-8' if flags & 0x800 else 'cp437')
+            offset += name_length + extra_length + comment_length
+            if not name.endswith('/') and not flags & 0x1:  # Skip folders and encrypted members
+                self.index[name] = (header_offset, compressed_size, size, method, crc)
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def read(self, name):
+        # Get the contents of a member as bytes
+        # Raises FileNotFoundError if there is no such member, ValueError if it can't be read
+        try:
+            header_offset, compressed_size, size, method, crc = self.index[name]
+        except KeyError:
+            raise FileNotFoundError(f"{name} is not in {self.path}") from None
+
+        # The local header repeats the name and may have a different extra field length
+        (signature, _, _, _, _, _, _, _, _, name_length, extra_length) = LOCAL_HEADER.unpack_from(self.data, header_offset)
+        if signature != LOCAL_HEADER_SIGNATURE:
+            raise ValueError(f"{name} in {self.path} has a damaged header")
+        start = header_offset + LOCAL_HEADER.size + name_length + extra_length
+        with memoryview(self.data)[start:start + compressed_size] as compressed:
+            if method == STORED:
+                contents = bytes(compressed)
+            elif method == DEFLATED:
+                contents = zlib.decompress(compressed, -zlib.MAX_WBITS)  # Raw deflate stream, no zlib header
+            else:
+                raise ValueError(f"{name} in {self.path} uses unsupported compression method {method}")
+        if len(contents) != size or zlib.crc32(contents) != crc:
+            raise ValueError(f"{name} in {self.path} is corrupt")
+        return contents
+
+    def close(self):
+        # Release the memory map
+        if self.data is not None:
+            self.data.close()
+            self.data = None
+
+class AssetFS(object):
+    # Virtual filesystem for game assets - a resources folder plus zip archives mounted on
+    # its top-level folders (e.g. res/aircrafts.zip serves res/aircrafts/...)
+    # Sources:
+    #   'auto' - use a folder's archive when it has the asset, otherwise the extracted folder;
+    #            an extracted file edited after its archive was opened is used instead of the archive
+    #   'zip'  - never fall back from an archive to its extracted folder (folders without an
+    #            archive, like SpaceShipsPack, are still read from disk)
+    #   'dir'  - only extracted folders
+    def __init__(self, root, source='auto'):
+        if source not in ('auto', 'zip', 'dir'):
+            raise ValueError(f"Unknown asset source: {source}")
+        self.root = root      # Resources folder
+        self.source = source  # Where assets are read from
+        self.archives = {}    # Top-level folder name -> ZipArchive
+
+        if source != 'dir':
+            for file_name in sorted(os.listdir(root)):
+                folder, extension = os.path.splitext(file_name)
+                if extension.lower() == '.zip':
+                    self.archives[folder] = ZipArchive(os.path.join(root, file_name))
+
+    def find(self, *path_parts):
+        # Get the archive and member name serving an asset, or (None, file path) for a plain file
+        # Archives whose file changed since they were opened are re-opened first
+        path = os.path.join(self.root, *path_parts)
+        archive = self.archives.get(path_parts[0])
+        if archive is not None:
+            if archive.changed():
+                archive.reopen()
+            name = '/'.join(path_parts[1:])
+            if self.source == 'zip':
+                return archive, name
+            if name in archive:
+                stamp = get_stamp(path)
+                if stamp is None or stamp[0] / 1e9 < archive.opened_at:
+                    return archive, name
+        return None, path
+
+    def read(self, *path_parts):
+        # Get the contents of an asset as bytes
+        # Raises FileNotFoundError if the asset doesn't exist
+        archive, name = self.find(*path_parts)
+        if archive is not None:
+            return archive.read(name)
+        with open(name, 'rb') as asset_file:
+            return asset_file.read()
+
+    def source_paths(self, *path_parts):
+        # Get the files on disk whose changes can change an asset - for change watching
+        # (its archive, if it's in one, and its extracted file unless only archives are used)
+        paths = []
+        archive = self.archives.get(path_parts[0])
+        if archive is not None:
+            paths.append(archive.path)
+        if archive is None or self.source != 'zip':
+            paths.append(os.path.join(self.root, *path_parts))
+        return tuple(paths)
+
+    def close(self):
+        # Release all mounted archives
+        for archive in self.archives.values():
+            archive.close()
+        self.archives.clear()
+
+def get_stamp(path):
+    # Get a file's (modification time, size), or None if it doesn't exist
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
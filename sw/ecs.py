@@ -0,0 +1,136 @@
+# ecs.py
+
+from array import array
+
+# Lifecycle states (the 'state' component), updated once per tick by the game's lifecycle stage
+SPAWNING = 0   # Created off-screen and still flying in - drawn once visible, not collidable yet
+ACTIVE = 1     # On screen - drawn and collidable (enemies bounce off the edges, so they stay on screen)
+DEAD = 2       # Destroyed - removed with the other dead entities by flush()
+
+# Component layouts - field name -> array typecode
+# Projectiles (bullets and rockets)
+PROJECTILE_COMPONENTS = {
+    'x': 'd', 'y': 'd',                    # Position (center)
+    'velocity_x': 'd', 'velocity_y': 'd',  # Movement per frame
+    'radius': 'B',                         # Size for drawing and collision
+    'damage': 'd',                         # Damage dealt on hit
+    'state': 'B'                           # Lifecycle state
+}
+# Enemies
+ENEMY_COMPONENTS = {
+    'x': 'd', 'y': 'd',                    # Position (top-left)
+    'velocity_x': 'd', 'velocity_y': 'd',  # Movement per frame
+    'width': 'H', 'height': 'H',           # Sprite size for bouncing and collision
+    'health': 'd', 'max_health': 'd',      # Remaining and starting health
+    'sprite': 'H',                         # Sprite id - index into Game.enemy_sprites
+    'state': 'B'                           # Lifecycle state
+}
+
+class Archetype(object):
+    # Dense storage for entities that share the same components
+    # Every component field is a typed column (array module) and an entity is a row index,
+    # so systems loop over flat arrays instead of looking up dict keys per entity.
+    # Columns are reachable as attributes, e.g. archetype.x[row]
+    # Every archetype has a 'state' column; systems iterate the row sets built by the lifecycle
+    # stage (visible_rows, active_rows) instead of every row
+    def __init__(self, name, fields):
+        self.name = name                # Archetype name (for debugging and snapshots)
+        self.fields = list(fields)      # Component field names, in storage order
+        self.columns = {}               # Field name -> typed column
+        for field, typecode in fields.items():
+            self.columns[field] = array(typecode)
+            setattr(self, field, self.columns[field])
+        self.ids = array('Q')           # Entity id stored in each row
+        self.rows = {}                  # Entity id -> row index
+        self.dead = set()               # Entity ids waiting to be removed by flush()
+        self.visible_rows = []          # Rows to draw (rebuilt after every flush)
+        self.active_rows = []           # Rows to collision-test (rebuilt after every flush)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def spawn(self, entity_id, **values):
+        # Append a new entity row - every component field must be given
+        # Entities spawned ACTIVE join the row sets straight away
+        row = len(self.ids)
+        for field in self.fields:
+            self.columns[field].append(values[field])
+        self.rows[entity_id] = row
+        self.ids.append(entity_id)
+        if values['state'] == ACTIVE:
+            self.visible_rows.append(row)
+            self.active_rows.append(row)
+        return row
+
+    def destroy(self, entity_id):
+        # Mark an entity DEAD - rows stay valid until flush() so systems can keep iterating
+        row = self.rows.get(entity_id)
+        if row is not None:
+            self.state[row] = DEAD
+        self.dead.add(entity_id)
+
+    def is_alive(self, entity_id):
+        # Check if an entity exists and hasn't been marked for removal
+        return entity_id in self.rows and entity_id not in self.dead
+
+    def flush(self):
+        # Remove all dead entities in bulk - each row is filled with the last row (swap-remove)
+        # Rows move, so the row sets are emptied until the lifecycle stage rebuilds them
+        if not self.dead:
+            return
+        for entity_id in self.dead:
+            row = self.rows.pop(entity_id, None)
+            if row is None:
+                continue
+            last = len(self.ids) - 1
+            if row != last:
+                for column in self.columns.values():
+                    column[row] = column[last]
+                moved_id = self.ids[last]
+                self.ids[row] = moved_id
+                self.rows[moved_id] = row
+            for column in self.columns.values():
+                column.pop()
+            self.ids.pop()
+        self.dead.clear()
+        del self.visible_rows[:]
+        del self.active_rows[:]
+
+    def clear(self):
+        # Remove all entities (columns are emptied in place so attribute references stay valid)
+        for column in self.columns.values():
+            del column[:]
+        del self.ids[:]
+        self.rows.clear()
+        self.dead.clear()
+        del self.visible_rows[:]
+        del self.active_rows[:]
+
+class World(object):
+    # Container for all archetypes - hands out unique entity ids
+    def __init__(self):
+        self.archetypes = {}  # Archetype name -> Archetype
+        self.next_id = 1      # Next entity id to hand out (0 is never used)
+
+    def add_archetype(self, name, fields):
+        # Create and register a new archetype
+        archetype = Archetype(name, fields)
+        self.archetypes[name] = archetype
+        return archetype
+
+    def spawn(self, archetype, **values):
+        # Create a new entity in the given archetype and return its id
+        entity_id = self.next_id
+        self.next_id += 1
+        archetype.spawn(entity_id, **values)
+        return entity_id
+
+    def flush(self):
+        # Remove dead entities from all archetypes
+        for archetype in self.archetypes.values():
+            archetype.flush()
+
+    def clear(self):
+        # Remove all entities from all archetypes
+        for archetype in self.archetypes.values():
+            archetype.clear()
@@ -0,0 +1,137 @@
+# frame_recorder.py
+
+import json
+import os
+import queue
+import threading
+
+import pygame
+
+class FrameRecorder(object):
+    # Records presented frames to disk without stalling the game loop
+    # Frames are copied into a fixed pool of reusable surfaces (one blit, no allocation) and
+    # written by a background thread straight from each surface's pixel buffer (get_buffer).
+    # When the writer falls behind and no pooled surface is free, frames are dropped instead
+    # of blocking the game. Frames are numbered by presented frame, so lost frames leave gaps.
+    # Formats:
+    #   'raw' - all frames appended to frames.raw, plus frames.json describing the pixel layout
+    #           and, once the recording is closed, which presented frames are missing from it
+    #           (convert with e.g. ffmpeg -f rawvideo -pix_fmt <pix_fmt> -s <WxH> -r <fps> -i frames.raw out.mp4)
+    #   'png' - one frame_000000.png file per written frame, named by presented frame number
+    def __init__(self, directory, surface, file_format='raw', pool_size=8, fps=60):
+        if file_format not in ('raw', 'png'):
+            raise ValueError(f"Unknown recording format: {file_format}")
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory      # Output folder
+        self.file_format = file_format  # 'raw' or 'png'
+        self.size = surface.get_size()  # Frame size (all captured surfaces must match)
+        self.frames_presented = 0       # Frames offered for capture - frame numbers count these
+        self.frames_captured = 0        # Frames queued for writing
+        self.frames_dropped = 0         # Frames skipped because the writer was behind
+        self.frames_written = 0         # Frames on disk
+        self.missing_frames = []        # Numbers of frames dropped or that failed to write
+        self.raw_info = None            # Contents of frames.json ('raw' format)
+
+        # Pool of reusable frame surfaces with the same pixel format as the source
+        self.pool = [surface.copy() for _ in range(pool_size)]
+        self.free_slots = queue.Queue()  # Pool indices ready to be filled
+        for slot in range(pool_size):
+            self.free_slots.put(slot)
+        self.pending = queue.Queue()     # (slot, frame number) waiting to be written (None = stop)
+
+        self.raw_file = None
+        if file_format == 'raw':
+            self.raw_file = open(os.path.join(directory, 'frames.raw'), 'wb')
+            self.write_raw_header(surface, fps)
+
+        self.worker = threading.Thread(target=self.run_worker, name='FrameRecorder', daemon=True)
+        self.worker.start()
+
+    def capture(self, surface):
+        # Copy a presented frame into a free pool surface and queue it - never blocks
+        frame_number = self.frames_presented
+        self.frames_presented += 1
+        try:
+            slot = self.free_slots.get_nowait()
+        except queue.Empty:
+            self.frames_dropped += 1  # Writer is behind - drop this frame
+            self.missing_frames.append(frame_number)
+            return False
+        self.pool[slot].blit(surface, (0, 0))
+        self.pending.put((slot, frame_number))
+        self.frames_captured += 1
+        return True
+
+    def close(self):
+        # Write all queued frames and stop the writer thread
+        self.pending.put(None)
+        self.worker.join()
+        if self.raw_file is not None:
+            self.raw_file.close()
+            # Record where frames are missing so playback timing can be reconstructed
+            self.raw_info['frames_presented'] = self.frames_presented
+            self.raw_info['missing_frames'] = sorted(self.missing_frames)
+            self.write_raw_info()
+        print(f"Recording saved to {self.directory}: {self.frames_written} of {self.frames_presented} "
+              f"frames written, {self.frames_dropped} dropped")
+
+    def run_worker(self):
+        # Background thread: write queued frames and hand their surfaces back to the pool
+        while True:
+            item = self.pending.get()
+            if item is None:
+                break
+            slot, frame_number = item
+            try:
+                self.write_frame(self.pool[slot], frame_number)
+                self.frames_written += 1
+            except (OSError, pygame.error) as error:
+                print(f"Could not write frame {frame_number}: {error}")
+                self.missing_frames.append(frame_number)
+            finally:
+                self.free_slots.put(slot)
+
+    def write_frame(self, frame, frame_number):
+        # Write one frame in the recording format
+        if self.file_format == 'png':
+            pygame.image.save(frame, os.path.join(self.directory, f'frame_{frame_number:06d}.png'))
+            return
+
+        # Raw: write the pixel buffer directly (row by row only if rows are padded)
+        # The buffer locks the surface, so it's released before the surface goes back to the pool
+        row_bytes = frame.get_width() * frame.get_bytesize()
+        pitch = frame.get_pitch()
+        buffer = frame.get_buffer()
+        with memoryview(buffer) as pixels:
+            if pitch == row_bytes:
+                self.raw_file.write(pixels)
+            else:
+                for row in range(frame.get_height()):
+                    self.raw_file.write(pixels[row * pitch:row * pitch + row_bytes])
+        del buffer
+
+    def write_raw_header(self, surface, fps):
+        # Describe the raw pixel layout next to the frame file
+        masks = surface.get_masks()
+        layouts = {  # (bytes per pixel, red, green, blue, alpha masks) -> ffmpeg pixel format
+            (4, 0xff0000, 0xff00, 0xff, 0): 'bgr0',
+            (4, 0xff0000, 0xff00, 0xff, 0xff000000): 'bgra',
+            (4, 0xff, 0xff00, 0xff0000, 0): 'rgb0',
+            (4, 0xff, 0xff00, 0xff0000, 0xff000000): 'rgba',
+            (3, 0xff0000, 0xff00, 0xff, 0): 'bgr24',
+            (3, 0xff, 0xff00, 0xff0000, 0): 'rgb24'
+        }
+        self.raw_info = {
+            'width': self.size[0],
+            'height': self.size[1],
+            'bytes_per_pixel': surface.get_bytesize(),
+            'masks': masks,
+            'pix_fmt': layouts.get((surface.get_bytesize(),) + tuple(masks)),
+            'fps': fps
+        }
+        self.write_raw_info()
+
+    def write_raw_info(self):
+        # Write frames.json
+        with open(os.path.join(self.directory, 'frames.json'), 'w') as info_file:
+            json.dump(self.raw_info, info_file, indent=2)
@@ -0,0 +1,163 @@
+# frame_scheduler.py
+
+import gc
+import time
+from collections import deque
+
+class ScheduledJob(object):
+    # Low-priority work run by FrameScheduler in the time left over at the end of a frame
+    def __init__(self, name, function, interval=0):
+        self.name = name          # For the statistics report
+        self.function = function  # Called with no arguments - returns True if it has more work to do
+        self.interval = interval  # Frames between runs (0 = one-off job)
+        self.next_frame = 0       # Frame the job is next due
+        self.cost = 0.0005        # Estimated run time (seconds), learned as the job runs
+        self.runs = 0
+
+class FrameScheduler(object):
+    # Frame pacing and leftover-budget scheduler
+    # Each frame's work is timed; what remains of the frame budget runs deferred jobs whose
+    # estimated cost still fits, then the frame is paced to its deadline.
+    # Pacing modes:
+    #   'hybrid' - sleep until spin_margin before the deadline, then spin (precise, little CPU)
+    #   'busy'   - pygame Clock.tick_busy_loop (precise, spins the whole wait)
+    #   'sleep'  - pygame Clock.tick (coarse sleep, the old behaviour)
+    def __init__(self, clock, fps=60, pacing='hybrid', spin_margin=0.002):
+        if pacing not in ('hybrid', 'busy', 'sleep'):
+            raise ValueError(f"Unknown pacing mode: {pacing}")
+        self.clock = clock                  # pygame Clock - still ticked so get_fps() keeps working
+        self.fps = fps
+        self.frame_length = 1.0 / fps       # Frame budget (seconds)
+        self.pacing = pacing
+        self.spin_margin = spin_margin      # Time before the deadline spent spinning instead of sleeping
+        self.frame = 0                      # Frames finished
+        self.frame_start = time.perf_counter()
+        self.deadline = self.frame_start + self.frame_length  # When the current frame should be shown
+        self.jobs = []                      # Queued ScheduledJobs, in priority order
+        self.finished_jobs = []             # One-off jobs that have completed
+        self.gc_thresholds = None           # Automatic GC thresholds, while GC is run manually
+
+        # Statistics
+        self.work_times = deque(maxlen=600)       # Frame work time (seconds), before jobs and pacing
+        self.frame_intervals = deque(maxlen=600)  # Time between frame starts (seconds)
+        self.overruns = 0                   # Frames whose work alone missed the deadline
+        self.forced_collections = 0         # GC runs that couldn't wait for leftover budget
+
+    def defer(self, name, function):
+        # Queue a one-off job - it runs again on later frames for as long as it returns True
+        self.jobs.append(ScheduledJob(name, function))
+
+    def every(self, name, function, interval):
+        # Queue a job to run every interval frames, when there's budget left
+        self.jobs.append(ScheduledJob(name, function, interval))
+
+    def begin_frame(self):
+        # Start timing a frame
+        now = time.perf_counter()
+        self.frame_intervals.append(now - self.frame_start)
+        self.frame_start = now
+
+    def end_frame(self):
+        # Run deferred jobs in the leftover budget, then wait for the frame deadline
+        now = time.perf_counter()
+        self.work_times.append(now - self.frame_start)
+        if now > self.deadline:
+            self.overruns += 1
+        self.run_jobs()
+        if self.gc_thresholds is not None:
+            self.force_collection()
+        self.wait()
+        self.frame += 1
+
+    def run_jobs(self):
+        # Run due jobs, in queue order, whose estimated cost fits in the budget left before the deadline
+        for job in list(self.jobs):
+            if job.next_frame > self.frame:
+                continue
+            start = time.perf_counter()
+            if self.deadline - start - self.spin_margin < job.cost:
+                # Doesn't fit - try the cheaper jobs behind it, and lower the estimate so a job
+                # estimated after one slow run doesn't starve forever
+                job.cost *= 0.9
+                continue
+            more = job.function()
+            elapsed = time.perf_counter() - start
+            # Follow the job's slowest recent runs, but never past the whole frame budget
+            job.cost = min(max(job.cost * 0.9 + elapsed * 0.1, elapsed), self.frame_length)
+            job.runs += 1
+            if job.interval:
+                job.next_frame = self.frame + job.interval
+            elif not more:
+                self.jobs.remove(job)
+                self.finished_jobs.append(job)
+
+    def wait(self):
+        # Pace the frame to its deadline
+        if self.pacing != 'hybrid':
+            # The clock paces in whole milliseconds, so the next deadline follows from when this
+            # frame actually ended rather than from a fixed cadence it would drift away from
+            if self.pacing == 'busy':
+                self.clock.tick_busy_loop(self.fps)
+            else:
+                self.clock.tick(self.fps)
+            self.deadline = time.perf_counter() + self.frame_length
+            return
+
+        remaining = self.deadline - time.perf_counter()
+        if remaining > self.spin_margin:
+            time.sleep(remaining - self.spin_margin)
+        while time.perf_counter() < self.deadline:
+            pass
+        self.clock.tick()  # Only measures the frame rate
+
+        # Keep a steady cadence, but don't try to catch up after a long stall
+        now = time.perf_counter()
+        self.deadline += self.frame_length
+        if self.deadline < now:
+            self.deadline = now + self.frame_length
+
+    def manage_gc(self):
+        # Freeze everything allocated so far and run the garbage collector from the leftover budget
+        # Call once loading is done - long-lived objects move to the permanent generation and
+        # are never scanned again
+        gc.collect()
+        gc.freeze()
+        self.gc_thresholds = gc.get_threshold()
+        gc.disable()
+        self.every('gc', self.collect_garbage, 1)
+
+    def collect_garbage(self):
+        # Collect the oldest generation that has reached its automatic collection threshold
+        generation = self.get_due_generation()
+        if generation is not None:
+            gc.collect(generation)
+
+    def force_collection(self):
+        # Collect anyway if garbage piles up because frames have no budget left - the oldest due
+        # generation, so older generations are still collected under sustained load
+        if gc.get_count()[0] >= self.gc_thresholds[0] * 10:
+            gc.collect(self.get_due_generation())
+            self.forced_collections += 1
+
+    def get_due_generation(self):
+        # Get the oldest generation that has reached its automatic collection threshold, or None
+        counts = gc.get_count()
+        for generation in (2, 1, 0):
+            if counts[generation] >= self.gc_thresholds[generation]:
+                return generation
+        return None
+
+    def report(self):
+        # Print frame time statistics for the recent frames
+        if not self.work_times:
+            return
+        work = sorted(self.work_times)
+        intervals = list(self.frame_intervals)[1:] or [0.0]
+        average = sum(intervals) / len(intervals)
+        deviation = (sum((interval - average) ** 2 for interval in intervals) / len(intervals)) ** 0.5
+        print(f"Frame work {sum(work) / len(work) * 1000:.2f} ms avg, "
+              f"{work[int(len(work) * 0.99) - 1] * 1000:.2f} ms p99, {work[-1] * 1000:.2f} ms max | "
+              f"frame interval {average * 1000:.2f} ms avg, {deviation * 1000:.3f} ms std dev | "
+              f"{self.overruns} overruns, {self.forced_collections} forced GC")
+        for job in self.finished_jobs + self.jobs:
+            print(f"  job {job.name}: {job.runs} runs, ~{job.cost * 1000:.2f} ms")
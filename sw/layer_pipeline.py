@@ -0,0 +1,102 @@
+# layer_pipeline.py
+
+import queue
+import threading
+import time
+
+import pygame
+
+class LayerPipeline(object):
+    # Pipelined renderer for the layers that don't depend on the entity state
+    # While the main thread runs the next frame's events and logic, a worker thread draws the
+    # background (sky and clouds) and the HUD for that frame onto their own surfaces, from the
+    # inputs predicted for it. The main thread only blits the finished layers under and over
+    # the entities and presents. pygame fills and blits release the GIL, so the worker's
+    # drawing overlaps with the game logic on a multi-core machine.
+    # A layer whose prediction turns out wrong (pause, score change...) is redrawn on the main
+    # thread, so the frame is always correct. Layers are single-buffered: the worker only
+    # draws between request() and take(), while the main thread isn't using them.
+    def __init__(self, target, draw_background, draw_hud, hud_size):
+        self.draw_background = draw_background  # function(surface, inputs) - draws an opaque full-screen layer
+        self.draw_hud = draw_hud                # function(surface, inputs) - draws onto a cleared transparent layer
+        self.background = pygame.Surface(target.get_size(), 0, target)  # Same pixel format as the target - plain copy blit
+        self.hud = pygame.Surface(hud_size, pygame.SRCALPHA)
+        self.background_inputs = None           # Inputs the background layer was drawn for
+        self.hud_inputs = None                  # Inputs the HUD layer was drawn for
+        self.pending = False                    # Worker is drawing (or about to draw) the layers
+        self.requests = queue.Queue()           # (background inputs, HUD inputs) to draw (None = stop)
+        self.finished = queue.Queue()           # Signalled when the requested layers are drawn
+
+        # Statistics
+        self.frames = 0                         # Frames composited
+        self.background_misses = 0              # Background layers redrawn on the main thread
+        self.hud_misses = 0                     # HUD layers redrawn on the main thread
+        self.wait_time = 0.0                    # Main thread time spent waiting for the worker (seconds)
+        self.worker_time = 0.0                  # Worker drawing time (seconds)
+
+        self.worker = threading.Thread(target=self.run_worker, name='LayerPipeline', daemon=True)
+        self.worker.start()
+
+    def request(self, background_inputs, hud_inputs):
+        # Start drawing the next frame's layers - call after presenting, with the predicted inputs
+        if background_inputs == self.background_inputs and hud_inputs == self.hud_inputs:
+            return  # Layers are already up to date
+        self.pending = True
+        self.requests.put((background_inputs, hud_inputs))
+
+    def take(self, background_inputs, hud_inputs):
+        # Get the (background, HUD) layers for this frame's actual inputs
+        # Waits for the worker if it's still drawing, then redraws any layer it predicted wrong
+        if self.pending:
+            start = time.perf_counter()
+            self.finished.get()
+            self.wait_time += time.perf_counter() - start
+            self.pending = False
+        if background_inputs != self.background_inputs:
+            self.build_background(background_inputs)
+            self.background_misses += 1
+        if hud_inputs != self.hud_inputs:
+            self.build_hud(hud_inputs)
+            self.hud_misses += 1
+        self.frames += 1
+        return self.background, self.hud
+
+    def build_background(self, inputs):
+        # Draw the background layer
+        self.draw_background(self.background, inputs)
+        self.background_inputs = inputs
+
+    def build_hud(self, inputs):
+        # Clear and draw the HUD layer
+        self.hud.fill((0, 0, 0, 0))
+        self.draw_hud(self.hud, inputs)
+        self.hud_inputs = inputs
+
+    def run_worker(self):
+        # Draw requested layers until told to stop
+        while True:
+            request = self.requests.get()
+            if request is None:
+                break
+            background_inputs, hud_inputs = request
+            start = time.perf_counter()
+            if background_inputs != self.background_inputs:
+                self.build_background(background_inputs)
+            if hud_inputs != self.hud_inputs:
+                self.build_hud(hud_inputs)
+            self.worker_time += time.perf_counter() - start
+            self.finished.put(True)
+
+    def close(self):
+        # Stop the worker thread
+        self.requests.put(None)
+        self.worker.join()
+
+    def report(self):
+        # Print pipeline statistics
+        if not self.frames:
+            return
+        print(f"Layer pipeline: {self.frames} frames, {self.background_misses} background and "
+              f"{self.hud_misses} HUD layers redrawn on the main thread, "
+              f"{self.worker_time / self.frames * 1000:.2f} ms/frame drawn by the worker, "
+              f"{self.wait_time / self.frames * 1000:.2f} ms/frame waited for it")
@@ -0,0 +1,227 @@
+# memory_profiler.py
+
+import gc
+import inspect
+import linecache
+import sys
+import time
+import tracemalloc
+
+import pygame
+
+class SurfaceCounter(object):
+    # Counts the Surfaces loaded and scaled through pygame's image.load and transform.scale/smoothscale
+    # and their pixel memory, by the method that asked for them - shows assets being loaded or
+    # rescaled again and again. These are plain functions, wrapped while the counter is installed;
+    # Surface() itself, Surface.copy/convert and Font.render are left alone (replacing the
+    # Surface type would break isinstance checks).
+    CREATORS = ((pygame.image, 'load'), (pygame.transform, 'scale'), (pygame.transform, 'smoothscale'))
+
+    def __init__(self, get_method):
+        self.get_method = get_method  # function(frame) -> name of the method that created a Surface
+        self.originals = []           # (module, name, original function) while installed
+        self.created = 0              # Surfaces created
+        self.created_bytes = 0        # Pixel bytes allocated for them
+        self.by_method = {}           # Method -> [Surfaces created, pixel bytes]
+
+    def install(self):
+        # Replace the functions with counting wrappers
+        for module, name in self.CREATORS:
+            original = getattr(module, name)
+            self.originals.append((module, name, original))
+            setattr(module, name, self.wrap(original))
+
+    def uninstall(self):
+        # Put the original functions back
+        for module, name, original in self.originals:
+            setattr(module, name, original)
+        self.originals = []
+
+    def wrap(self, create):
+        # Get a counting version of a Surface creating function
+        def counted(*args, **kwargs):
+            surface = create(*args, **kwargs)
+            if not any(surface is arg for arg in args) and surface is not kwargs.get('dest_surface'):
+                self.count(surface, sys._getframe(1))  # Not just a caller's destination Surface returned
+            return surface
+        return counted
+
+    def count(self, surface, frame):
+        # Count a new Surface
+        size = surface.get_pitch() * surface.get_height()
+        self.created += 1
+        self.created_bytes += size
+        totals = self.by_method.setdefault(self.get_method(frame), [0, 0])
+        totals[0] += 1
+        totals[1] += size
+
+class MemoryProfiler(object):
+    # Diagnostics mode for soak runs - samples tracemalloc and GC stats every few frames,
+    # attributes memory growth to the methods of a class (e.g. Game) and writes a diff
+    # report on exit
+    # tracemalloc only sees Python allocations - Surface pixel memory is counted separately:
+    # live Surfaces are counted every surface_interval frames (keeping the peak), and loads and
+    # rescales by a SurfaceCounter
+    def __init__(self, target_class, report_path, interval=600, traceback_depth=10, surface_interval=60):
+        self.report_path = report_path    # Where close() writes the report
+        self.interval = interval          # Frames between samples
+        self.surface_interval = surface_interval  # Frames between live Surface counts
+        self.peak_surfaces = (0, 0)       # Most live Surfaces seen in any count, with their pixel bytes
+        self.frame = 0                    # Frames seen so far
+        self.samples = []                 # One dict per sample (see sample())
+        self.start_time = time.perf_counter()
+
+        # Line ranges of the target class's methods, used to attribute allocations
+        self.source_file = inspect.getsourcefile(target_class)
+        self.method_lines = []            # (first line, last line, method name)
+        for name, member in vars(target_class).items():
+            if inspect.isfunction(member):
+                code = member.__code__
+                last_line = max(line for _, _, line in code.co_lines() if line is not None)
+                self.method_lines.append((code.co_firstlineno, last_line, f'{target_class.__name__}.{name}'))
+
+        self.surface_counter = SurfaceCounter(self.get_frame_method)
+        self.surface_counter.install()
+        self.last_created = (0, 0)        # Surfaces and pixel bytes created at the last sample
+
+        tracemalloc.start(traceback_depth)
+        self.baseline = self.take_snapshot()
+        self.last_snapshot = self.baseline
+        self.sample()
+
+    def tick(self):
+        # Count a frame and take a sample every `interval` frames
+        self.frame += 1
+        if self.frame % self.interval == 0:
+            self.sample()
+        elif self.frame % self.surface_interval == 0:
+            self.count_live_surfaces()
+
+    def take_snapshot(self):
+        # Take a tracemalloc snapshot without the profiler's own allocations
+        return tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, linecache.__file__),
+            tracemalloc.Filter(False, __file__)
+        ])
+
+    def sample(self):
+        # Record traced memory, GC state and Surfaces, and the growth since the last sample
+        snapshot = self.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        counter = self.surface_counter
+        live_surfaces, live_surface_bytes = self.count_live_surfaces()
+        growth = self.attribute_growth(snapshot, self.last_snapshot)
+        self.samples.append({
+            'frame': self.frame,
+            'seconds': time.perf_counter() - self.start_time,
+            'current': current,
+            'peak': peak,
+            'gc_counts': gc.get_count(),
+            'gc_collections': [generation['collections'] for generation in gc.get_stats()],
+            'live_surfaces': live_surfaces,
+            'live_surface_bytes': live_surface_bytes,
+            'surfaces_created': counter.created - self.last_created[0],
+            'surface_bytes_created': counter.created_bytes - self.last_created[1],
+            'top_growth': growth[:3]
+        })
+        self.last_snapshot = snapshot
+        self.last_created = (counter.created, counter.created_bytes)
+
+    def count_live_surfaces(self):
+        # Count the Surfaces referenced from Python objects and their pixel bytes, and keep the peak
+        # (Surfaces themselves aren't GC-tracked, so they're found through the containers,
+        # instances and frames that hold them - cached assets included)
+        surfaces = {}
+        for obj in gc.get_objects():
+            for referent in gc.get_referents(obj):
+                if isinstance(referent, pygame.Surface):
+                    surfaces[id(referent)] = referent
+        count = len(surfaces)
+        size = sum(surface.get_pitch() * surface.get_height() for surface in surfaces.values())
+        if count > self.peak_surfaces[0]:
+            self.peak_surfaces = (count, size)
+        return count, size
+
+    def get_method(self, traceback):
+        # Get the innermost target-class method in an allocation traceback
+        for frame in reversed(traceback):  # Tracebacks are ordered oldest frame first
+            name = self.get_line_method(frame.filename, frame.lineno)
+            if name is not None:
+                return name
+        return '<other>'
+
+    def get_frame_method(self, frame):
+        # Get the innermost target-class method on a call stack
+        while frame is not None:
+            name = self.get_line_method(frame.f_code.co_filename, frame.f_lineno)
+            if name is not None:
+                return name
+            frame = frame.f_back
+        return '<other>'
+
+    def get_line_method(self, filename, lineno):
+        # Get the target-class method containing a source line, or None
+        if filename == self.source_file:
+            for first_line, last_line, name in self.method_lines:
+                if first_line <= lineno <= last_line:
+                    return name
+        return None
+
+    def attribute_growth(self, snapshot, previous):
+        # Get (method, bytes grown, blocks grown) between two snapshots, largest growth first
+        growth = {}
+        for diff in snapshot.compare_to(previous, 'traceback'):
+            method = self.get_method(diff.traceback)
+            size, count = growth.get(method, (0, 0))
+            growth[method] = (size + diff.size_diff, count + diff.count_diff)
+        return sorted(((method, size, count) for method, (size, count) in growth.items()),
+                      key=lambda item: item[1], reverse=True)
+
+    def close(self):
+        # Take a final sample, write the report and stop tracing
+        self.sample()
+        self.surface_counter.uninstall()
+        counter = self.surface_counter
+        final = self.last_snapshot
+        with open(self.report_path, 'w') as report:
+            report.write(f"Memory profile - {self.frame} frames, "
+                         f"{time.perf_counter() - self.start_time:.1f} s, {len(self.samples)} samples\n")
+            report.write("Traced figures are Python allocations only - Surface pixel memory is allocated by SDL, "
+                         "isn't included in them and is counted separately below\n")
+            report.write(f"Peak live Surfaces: {self.peak_surfaces[0]} ({self.peak_surfaces[1] / 1024:.1f} KiB pixels) - "
+                         f"counted every {self.surface_interval} frames, between frames, so Surfaces created "
+                         f"and freed within a frame aren't included\n")
+            report.write(f"Surfaces loaded or scaled: {counter.created} ({counter.created_bytes / 1024:.1f} KiB pixels), "
+                         f"{counter.created / max(self.frame, 1):.2f} per frame\n\n")
+
+            report.write("Samples (surfaces = Surfaces referenced from Python objects at the sample, "
+                         "loaded = Surfaces loaded or scaled since the previous sample)\n")
+            report.write(f"{'frame':>8} {'seconds':>8} {'traced KiB':>11} {'peak KiB':>9} "
+                         f"{'surfaces':>9} {'pixel KiB':>10} {'loaded':>7} {'loaded KiB':>11}  "
+                         f"gc counts / collections\n")
+            for sample in self.samples:
+                report.write(f"{sample['frame']:>8} {sample['seconds']:>8.1f} {sample['current'] / 1024:>11.1f} "
+                             f"{sample['peak'] / 1024:>9.1f} {sample['live_surfaces']:>9} "
+                             f"{sample['live_surface_bytes'] / 1024:>10.1f} "
+                             f"{sample['surfaces_created']:>7} {sample['surface_bytes_created'] / 1024:>11.1f}  "
+                             f"{sample['gc_counts']} / {sample['gc_collections']}\n")
+                for method, size, count in sample['top_growth']:
+                    if size > 0:
+                        report.write(f"{'':>18} {size / 1024:>+9.1f} KiB {count:>+6} blocks  {method}\n")
+
+            report.write("\nSurfaces loaded or scaled by method\n")
+            for method, (count, size) in sorted(counter.by_method.items(), key=lambda item: item[1][1], reverse=True):
+                report.write(f"{size / 1024:>11.1f} KiB {count:>8} Surfaces  {method}\n")
+
+            report.write("\nGrowth since start by method\n")
+            for method, size, count in self.attribute_growth(final, self.baseline):
+                if size or count:
+                    report.write(f"{size / 1024:>+11.1f} KiB {count:>+8} blocks  {method}\n")
+
+            report.write("\nGrowth since start by line (top 20)\n")
+            for diff in final.compare_to(self.baseline, 'lineno')[:20]:
+                report.write(f"{diff}\n")
+
+        tracemalloc.stop()
+        print(f"Memory report written to {self.report_path}")
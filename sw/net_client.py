@@ -0,0 +1,289 @@
+# net_client.py
+
+import asyncio
+import json
+import math
+import time
+from collections import deque
+
+from ecs import ACTIVE, SPAWNING
+from netcode import (ALIVE, ENEMY, FIRE, FIRING, GAME_ACTIVE, INPUT, INPUT_MESSAGE, PROTOCOL_VERSION,
+                     ROCKET, ROCKET_FIRE, ROCKET_FIRING, UPGRADE_AVAILABLE, UPGRADE_LEFT, UPGRADE_RIGHT,
+                     decode_snapshot, dequantize, quantize)
+
+class ClientProtocol(asyncio.DatagramProtocol):
+    # UDP endpoint - hands snapshot packets to the client
+    def __init__(self, client):
+        self.client = client
+
+    def datagram_received(self, data, address):
+        self.client.receive_snapshot(data)
+
+class View(object):
+    # Interpolated game state to draw - positions in pixels
+    # entities: entity id -> (kind, x, y, sprite id, health 0-255)
+    # players: player id -> (x, y, health, invulnerable frames, flags)
+    def __init__(self, snapshot, players, entities):
+        self.score = snapshot.score
+        self.flags = snapshot.flags
+        self.left_weapon_level = snapshot.left_weapon_level
+        self.right_weapon_level = snapshot.right_weapon_level
+        self.players = players
+        self.entities = entities
+
+class GameClient(object):
+    # Co-op client - sends input, decodes delta snapshots and interpolates between them
+    # Drawing runs interpolation_delay seconds behind the newest server state, so there are
+    # normally two snapshots around the drawn moment to blend between
+    def __init__(self, host='127.0.0.1', port=5555, interpolation_delay=0.1):
+        self.host = host
+        self.port = port
+        self.interpolation_delay = interpolation_delay
+        self.info = None                     # Handshake from the server
+        self.player_id = None
+        self.reader = None                   # TCP connection - the player stays joined while it's open
+        self.writer = None
+        self.transport = None                # UDP transport
+        self.input_sequence = 0              # Sequence of the last input sent
+        self.states = {}                     # Snapshot sequence -> entity state, kept as delta baselines
+        self.history_size = 64               # Decoded entity states kept
+        self.latest_sequence = 0             # Newest snapshot decoded (acknowledged with every input)
+        self.buffer = deque(maxlen=32)       # (server time, snapshot) for interpolation, oldest first
+        self.clock_offset = None             # Server time minus local time, smoothed
+
+        # Metrics
+        self.start_time = time.perf_counter()
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.snapshots_received = 0
+        self.snapshots_lost = 0              # Sequence gaps
+        self.snapshots_late = 0              # Arrived after a newer snapshot
+        self.snapshots_undecodable = 0       # Malformed or against an unknown baseline
+        self.views = 0                       # Interpolated views produced
+        self.views_starved = 0               # Views that had no newer snapshot to blend towards
+
+    async def connect(self):
+        # Join the server - TCP handshake, then open the UDP channel
+        # Raises ConnectionError if the server refuses the player
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        self.info = json.loads(await self.reader.readline() or b'{"error": "No handshake"}')
+        if 'error' in self.info or self.info.get('protocol') != PROTOCOL_VERSION:
+            self.writer.close()
+            raise ConnectionError(self.info.get('error', 'Protocol version mismatch'))
+        self.player_id = self.info['player_id']
+        loop = asyncio.get_running_loop()
+        self.transport, _ = await loop.create_datagram_endpoint(
+            lambda: ClientProtocol(self), remote_addr=(self.host, self.info['udp_port']))
+
+    def close(self):
+        # Leave the server
+        if self.transport is not None:
+            self.transport.close()
+        if self.writer is not None:
+            self.writer.close()
+
+    def send_input(self, x, y, buttons):
+        # Send this frame's aircraft position and buttons, acknowledging the newest snapshot
+        self.input_sequence += 1
+        data = INPUT_MESSAGE.pack(INPUT, self.player_id, self.info['token'], self.input_sequence,
+                                  self.latest_sequence, quantize(x), quantize(y), buttons)
+        self.transport.sendto(data)
+        self.bytes_sent += len(data)
+
+    def receive_snapshot(self, data):
+        # Decode a snapshot against its baseline and add it to the interpolation buffer
+        self.bytes_received += len(data)
+        self.snapshots_received += 1
+        try:
+            snapshot = decode_snapshot(data, self.states.get)
+        except ValueError:
+            self.snapshots_undecodable += 1
+            return
+        if snapshot.sequence <= self.latest_sequence:
+            self.snapshots_late += 1
+            return
+        self.snapshots_lost += snapshot.sequence - self.latest_sequence - 1 if self.latest_sequence else 0
+        self.latest_sequence = snapshot.sequence
+        self.states[snapshot.sequence] = snapshot.entities
+        self.states.pop(snapshot.sequence - self.history_size, None)
+
+        # Track the server clock - the smallest delay seen is the best estimate
+        server_time = snapshot.tick / self.info['tick_rate']
+        offset = server_time - time.perf_counter()
+        if self.clock_offset is None or offset > self.clock_offset:
+            self.clock_offset = offset
+        else:
+            self.clock_offset += (offset - self.clock_offset) * 0.05  # Follow slowly when packets get slower
+        self.buffer.append((server_time, snapshot))
+
+    def get_view(self):
+        # Get the game state to draw now, blended between the two snapshots around the drawn moment
+        # Returns None until the first snapshot arrives
+        if not self.buffer:
+            return None
+        self.views += 1
+        render_time = time.perf_counter() + self.clock_offset - self.interpolation_delay
+
+        older_time, older = self.buffer[0]
+        newer_time, newer = older_time, older
+        for snapshot_time, snapshot in self.buffer:
+            if snapshot_time > render_time:
+                newer_time, newer = snapshot_time, snapshot
+                break
+            older_time, older = snapshot_time, snapshot
+        else:
+            # Nothing newer yet - hold the newest state rather than guess ahead
+            self.views_starved += 1
+            newer_time, newer = older_time, older
+        fraction = 0.0 if newer_time <= older_time else (render_time - older_time) / (newer_time - older_time)
+        fraction = max(0.0, min(1.0, fraction))
+
+        # Entities that exist in both snapshots are blended; new ones appear once the newer snapshot is reached
+        entities = {}
+        for entity_id, (kind, x, y, sprite, health) in older.entities.items():
+            target = newer.entities.get(entity_id)
+            if target is None:
+                continue  # Destroyed by the newer snapshot
+            entities[entity_id] = (kind, dequantize(x + (target[1] - x) * fraction),
+                                   dequantize(y + (target[2] - y) * fraction), sprite, health)
+        players = {}
+        for player_id, (x, y, health, invulnerable, flags) in newer.players.items():
+            start = older.players.get(player_id, (x, y))
+            players[player_id] = (dequantize(start[0] + (x - start[0]) * fraction),
+                                  dequantize(start[1] + (y - start[1]) * fraction), health, invulnerable, flags)
+        return View(newer, players, entities)
+
+    def report(self):
+        # Print bandwidth and snapshot statistics since the client started
+        elapsed = max(1e-6, time.perf_counter() - self.start_time)
+        print(f"Player {self.player_id}: {self.snapshots_received / elapsed:.1f} snapshots/s, "
+              f"avg {self.bytes_received / max(1, self.snapshots_received):.0f} B | "
+              f"in {self.bytes_received / elapsed / 1024:.1f} KiB/s, out {self.bytes_sent / elapsed / 1024:.1f} KiB/s | "
+              f"lost {self.snapshots_lost}, late {self.snapshots_late}, undecodable {self.snapshots_undecodable} | "
+              f"starved {self.views_starved}/{self.views} views")
+
+async def run_bot(client, duration, index, frame_rate=60):
+    # Headless player - flies a loop, keeps firing, restarts games and takes upgrades
+    end_time = time.perf_counter() + duration
+    frame = 0
+    while time.perf_counter() < end_time:
+        seconds = frame / frame_rate
+        x = 375 + 300 * math.cos(seconds * 0.8 + index * 1.7)
+        y = 420 + 100 * math.sin(seconds * 1.3 + index)
+        buttons = ROCKET_FIRE if (frame // 90) % 2 else 0
+        if (frame // 20) % 4:
+            buttons |= FIRE  # Released now and then so a press can start the next game
+        view = client.get_view()
+        if view is not None and view.flags & UPGRADE_AVAILABLE and frame % 60 == index:
+            buttons |= UPGRADE_LEFT if index % 2 else UPGRADE_RIGHT
+        client.send_input(x, y, buttons)
+        frame += 1
+        await asyncio.sleep(1.0 / frame_rate)
+
+async def run_bots(host, port, count, duration):
+    # Connect several bot players on this machine and report their network statistics
+    clients = [GameClient(host, port) for _ in range(count)]
+    for client in clients:
+        await client.connect()
+    try:
+        await asyncio.gather(*(run_bot(client, duration, index) for index, client in enumerate(clients)))
+    finally:
+        for client in clients:
+            client.report()
+            client.close()
+
+async def run_viewer(host, port, presenter_options):
+    # Play in a window - the local Game draws the interpolated server state
+    import pygame
+    from PyShoot import Game, Presenter
+
+    client = GameClient(host, port)
+    await client.connect()
+    game = Game(0, 0, presenter=Presenter(*presenter_options))
+    game.enemy_sprites = list(client.info['enemy_sprites'])
+    frame_length = 1.0 / 60
+    try:
+        running = True
+        while running:
+            frame_start = time.perf_counter()
+            buttons = 0
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    running = False
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_1:
+                    buttons |= UPGRADE_LEFT
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_2:
+                    buttons |= UPGRADE_RIGHT
+            left, _, right = pygame.mouse.get_pressed()
+            buttons |= (FIRE if left else 0) | (ROCKET_FIRE if right else 0)
+            mouse_x, mouse_y = game.presenter.to_logical(pygame.mouse.get_pos())
+            client.send_input(mouse_x, mouse_y, buttons)
+
+            view = client.get_view()
+            if view is not None:
+                apply_view(game, client.player_id, view)
+            game.input.mouse_x, game.input.mouse_y = mouse_x, mouse_y  # Own aircraft follows the mouse at once
+            game.display_frame(game.presenter.surface)
+
+            await asyncio.sleep(max(0.0, frame_length - (time.perf_counter() - frame_start)))
+    finally:
+        client.report()
+        client.close()
+        game.stats_store.close()
+        pygame.quit()
+
+def apply_view(game, player_id, view):
+    # Load an interpolated view into a Game that is only used for drawing
+    game.world.clear()
+    for kind, x, y, sprite, health in view.entities.values():
+        if kind == ENEMY:
+            enemy_surface, _ = game.get_enemy_sprite(game.enemy_sprites[sprite])
+            game.world.spawn(game.enemies, x=x, y=y, velocity_x=0.0, velocity_y=0.0,
+                             width=enemy_surface.get_width(), height=enemy_surface.get_height(),
+                             health=health, max_health=255, sprite=sprite, state=SPAWNING)
+        else:
+            radius = game.rocket_radius if kind == ROCKET else game.bullet_radius
+            game.world.spawn(game.rockets if kind == ROCKET else game.bullets, x=x, y=y,
+                             velocity_x=0.0, velocity_y=0.0, radius=radius, damage=0.0, state=ACTIVE)
+    game.enemy_grid.clear()
+    game.lifecycle_stage()  # Works out what's on screen
+
+    game.score = view.score
+    game.game_active = bool(view.flags & GAME_ACTIVE)
+    game.game_started = True
+    if game.game_active:
+        game.session_number = max(1, game.session_number)  # Game over screen rather than title from now on
+    game.upgrade_available = bool(view.flags & UPGRADE_AVAILABLE)
+    game.left_weapon_level = view.left_weapon_level
+    game.right_weapon_level = view.right_weapon_level
+
+    own = view.players.get(player_id)
+    if own is not None:
+        _, _, game.player_health, game.player_invulnerable, flags = own
+        game.is_firing = bool(flags & FIRING)
+        game.is_rocket_firing = bool(flags & ROCKET_FIRING)
+        game.muzzle_flash_frame = game.animation_tick % game.muzzle_flash_duration
+        game.rocket_flash_frame = game.animation_tick % game.rocket_flash_duration
+    game.wingmen = [(int(x), int(y)) for other_id, (x, y, _, _, flags) in view.players.items()
+                    if other_id != player_id and flags & ALIVE]
+    game.animation_tick += 1
+    game.cloud_offset += 0.5
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='PyShoot co-op client')
+    parser.add_argument('--host', default='127.0.0.1', help='server address (default: %(default)s)')
+    parser.add_argument('--port', type=int, default=5555, help='server port (default: %(default)s)')
+    parser.add_argument('--bots', type=int, metavar='COUNT', help='run COUNT headless bot players instead of a window')
+    parser.add_argument('--duration', type=float, default=10.0, help='bot run time in seconds (default: %(default)s)')
+    parser.add_argument('--window', default='800x600', help='window size as WIDTHxHEIGHT (default: %(default)s)')
+    parser.add_argument('--scale', default='auto', choices=['auto', 'direct', 'scaled', 'integer', 'smooth'],
+                        help='how the game is scaled to the window (default: %(default)s)')
+    args = parser.parse_args()
+
+    if args.bots:
+        asyncio.run(run_bots(args.host, args.port, args.bots, args.duration))
+    else:
+        window_size = tuple(int(value) for value in args.window.lower().split('x'))
+        asyncio.run(run_viewer(args.host, args.port, (window_size, False, args.scale)))
@@ -0,0 +1,323 @@
+# net_server.py
+
+import os
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')  # Headless - the server never shows a window
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import asyncio
+import contextlib
+import json
+import secrets
+import struct
+import time
+
+from PyShoot import SCREEN_SIZE, Game
+from netcode import (ALIVE, BULLET, ENEMY, FIRE, FIRING, GAME_ACTIVE, INPUT, INPUT_MESSAGE, PROTOCOL_VERSION,
+                     ROCKET, ROCKET_FIRE, ROCKET_FIRING, UPGRADE_AVAILABLE, UPGRADE_LEFT, UPGRADE_RIGHT,
+                     Snapshot, dequantize, encode_snapshot, quantize)
+
+# Game attributes that belong to each player - swapped in and out of the game by CoopGame.each_player
+PLAYER_FIELDS = [
+    'mouse_held', 'right_mouse_held', 'fire_cooldown', 'rocket_fire_cooldown',
+    'is_firing', 'muzzle_flash_frame', 'is_rocket_firing', 'rocket_flash_frame',
+    'player_health', 'player_invulnerable'
+]
+
+class RemotePlayer(object):
+    # A connected client and its share of the game state
+    def __init__(self, player_id, token):
+        self.player_id = player_id       # Player id (1-255)
+        self.token = token               # Secret sent in the handshake - inputs must carry it
+        self.address = None              # UDP address, learned from the first input packet
+        self.x = SCREEN_SIZE[0] // 2     # Aircraft position (top-left, like the local mouse position)
+        self.y = SCREEN_SIZE[1] - 100
+        self.buttons = 0                 # Buttons held in the latest input
+        self.pressed = 0                 # Buttons pressed since the last tick
+        self.input_sequence = 0          # Latest input sequence received (older inputs are ignored)
+        self.acked_sequence = 0          # Latest snapshot the client decoded - the next delta baseline
+        self.state = {}                  # PLAYER_FIELDS values while another player is loaded
+        self.bytes_sent = 0              # Snapshot bytes sent to this client
+
+class CoopGame(Game):
+    # Game with several players sharing one world, score and weapon levels
+    # The single-player systems run unchanged: each_player loads every remote player's
+    # position and per-player state into the game before the per-player systems run
+    def __init__(self):
+        super().__init__(0, 0)
+        self.players = {}                # Player id -> RemotePlayer
+        self.current_player = None       # Player loaded into the game by each_player
+
+    def add_player(self, player):
+        # Join a player with fresh per-player state
+        player.state = {field: getattr(self, field) for field in PLAYER_FIELDS}
+        player.state.update(player_health=self.player_max_health, player_invulnerable=0,
+                            mouse_held=False, right_mouse_held=False)
+        self.players[player.player_id] = player
+
+    def remove_player(self, player):
+        # Drop a player - the session ends when the last player leaves
+        self.players.pop(player.player_id, None)
+        if not self.players:
+            self.end_session()
+
+    def each_player(self):
+        # Load each living player's state into the game in turn, saving it back afterwards
+        for player in list(self.players.values()):
+            if player.state['player_health'] <= 0:
+                continue  # Out of this session - waits for the next one
+            self.current_player = player
+            self.input.mouse_x, self.input.mouse_y = player.x, player.y
+            for field in PLAYER_FIELDS:
+                setattr(self, field, player.state[field])
+            yield player
+            for field in PLAYER_FIELDS:
+                player.state[field] = getattr(self, field)
+        self.current_player = None
+
+    def begin_game(self):
+        # Start a session with every player at full health
+        super().begin_game()
+        fresh = {field: getattr(self, field) for field in PLAYER_FIELDS}
+        for player in self.players.values():
+            player.state = dict(fresh)
+
+    def end_session(self):
+        # A player ran out of health - the session only ends once nobody is left
+        if self.current_player is not None and any(
+                player.state['player_health'] > 0 for player in self.players.values()
+                if player is not self.current_player):
+            return
+        super().end_session()
+
+    def apply_input(self, player):
+        # Apply a player's latest buttons - new presses start a game or pick an upgrade
+        player.state['mouse_held'] = bool(player.buttons & FIRE)
+        player.state['right_mouse_held'] = bool(player.buttons & ROCKET_FIRE)
+        if player.pressed & FIRE and not self.game_active:
+            self.session_number += 1
+            self.game_active = True
+            self.game_started = False
+        if self.upgrade_available:
+            if player.pressed & UPGRADE_LEFT:
+                self.upgrade_left_weapon()
+            elif player.pressed & UPGRADE_RIGHT:
+                self.upgrade_right_weapon()
+        player.pressed = 0
+
+    def capture_snapshot(self, sequence, tick):
+        # Get the replicated state with quantized positions
+        entities = {}
+        for kind, projectiles in ((BULLET, self.bullets), (ROCKET, self.rockets)):
+            xs, ys, ids = projectiles.x, projectiles.y, projectiles.ids
+            for row in range(len(projectiles)):
+                entities[ids[row]] = (kind, quantize(xs[row]), quantize(ys[row]), 0, 255)
+        enemies = self.enemies
+        for row in range(len(enemies)):
+            health = int(255 * max(0.0, enemies.health[row]) / enemies.max_health[row])
+            entities[enemies.ids[row]] = (ENEMY, quantize(enemies.x[row]), quantize(enemies.y[row]),
+                                          enemies.sprite[row], health)
+
+        players = {}
+        for player in self.players.values():
+            state = player.state
+            flags = ((ALIVE if state['player_health'] > 0 else 0) |
+                     (FIRING if state['is_firing'] else 0) |
+                     (ROCKET_FIRING if state['is_rocket_firing'] else 0))
+            players[player.player_id] = (quantize(player.x), quantize(player.y), max(0, state['player_health']),
+                                         min(255, state['player_invulnerable']), flags)
+
+        flags = (GAME_ACTIVE if self.game_active else 0) | (UPGRADE_AVAILABLE if self.upgrade_available else 0)
+        return Snapshot(sequence, tick, self.score, flags, min(255, self.left_weapon_level),
+                        min(255, self.right_weapon_level), players, entities)
+
+class ServerProtocol(asyncio.DatagramProtocol):
+    # UDP endpoint - hands input packets to the server
+    def __init__(self, server):
+        self.server = server
+
+    def datagram_received(self, data, address):
+        self.server.receive_input(data, address)
+
+class GameServer(object):
+    # Authoritative headless co-op server
+    # Runs the game rules at tick_rate and sends each client a snapshot every
+    # tick_rate / snapshot_rate ticks, delta-encoded against the last one it acknowledged
+    def __init__(self, host='127.0.0.1', port=5555, tick_rate=60, snapshot_rate=20, max_players=4,
+                 report_interval=5.0, verbose=False):
+        self.host = host
+        self.port = port                     # TCP handshake and UDP game traffic share the port number
+        self.tick_rate = tick_rate
+        self.snapshot_interval = max(1, tick_rate // snapshot_rate)  # Ticks between snapshots
+        self.max_players = max_players
+        self.verbose = verbose               # Show the game's own log output
+        self.game = CoopGame()
+        self.transport = None                # UDP transport, once running
+        self.tick_count = 0
+        self.sequence = 0                    # Latest snapshot sequence
+        self.history = {}                    # Snapshot sequence -> entity state, for delta baselines
+        self.history_size = 32               # Snapshots kept as baselines (1.6 seconds at 20 per second)
+        self.log = open(os.devnull, 'w')     # Game log output goes here unless verbose
+
+        # Metrics, reset every report_interval seconds
+        self.report_interval = report_interval
+        self.report_start = time.perf_counter()
+        self.tick_times = []                 # Seconds spent in each tick (logic and snapshots)
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.snapshots_sent = 0
+        self.full_snapshots = 0
+        self.clients_served = set()          # Players sent snapshots
+
+    async def run(self, duration=None):
+        # Serve until cancelled (or for duration seconds)
+        loop = asyncio.get_running_loop()
+        tcp_server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        self.transport, _ = await loop.create_datagram_endpoint(
+            lambda: ServerProtocol(self), local_addr=(self.host, self.port))
+        print(f"Co-op server listening on {self.host}:{self.port} (TCP and UDP)")
+
+        tick_length = 1.0 / self.tick_rate
+        next_tick = loop.time()
+        end_time = None if duration is None else loop.time() + duration
+        try:
+            while end_time is None or loop.time() < end_time:
+                self.tick()
+                next_tick += tick_length
+                delay = next_tick - loop.time()
+                if delay < -5 * tick_length:
+                    next_tick = loop.time()  # Fell far behind - don't try to catch up with a burst of ticks
+                await asyncio.sleep(max(0.0, delay))
+        finally:
+            tcp_server.close()
+            self.transport.close()
+            self.report()
+            self.game.end_session()
+            self.game.stats_store.close()
+
+    async def handle_connection(self, reader, writer):
+        # TCP session - send the handshake, then keep the player joined until the connection closes
+        player_id = next((number for number in range(1, 256) if number not in self.game.players), None)
+        if player_id is None or len(self.game.players) >= self.max_players:
+            writer.write((json.dumps({'error': 'Server is full'}) + '\n').encode())
+            writer.close()
+            return
+
+        player = RemotePlayer(player_id, secrets.randbits(32))
+        self.game.add_player(player)
+        print(f"Player {player_id} joined from {writer.get_extra_info('peername')}")
+        handshake = {
+            'protocol': PROTOCOL_VERSION,
+            'player_id': player_id,
+            'token': player.token,
+            'udp_port': self.port,
+            'tick_rate': self.tick_rate,
+            'snapshot_rate': self.tick_rate / self.snapshot_interval,
+            'enemy_sprites': self.game.enemy_sprites
+        }
+        try:
+            writer.write((json.dumps(handshake) + '\n').encode())
+            await writer.drain()
+            await reader.read()  # Returns at EOF
+        except ConnectionError:
+            pass
+        finally:
+            self.game.remove_player(player)
+            writer.close()
+            print(f"Player {player_id} left")
+
+    def receive_input(self, data, address):
+        # Store the latest input of a player (late and duplicate packets are ignored)
+        self.bytes_received += len(data)
+        try:
+            message_type, player_id, token, sequence, acked, x, y, buttons = INPUT_MESSAGE.unpack(data)
+        except struct.error:
+            return
+        player = self.game.players.get(player_id)
+        if message_type != INPUT or player is None or token != player.token or sequence <= player.input_sequence:
+            return
+        player.address = address
+        player.input_sequence = sequence
+        player.acked_sequence = max(player.acked_sequence, acked)
+        player.pressed |= buttons & ~player.buttons
+        player.buttons = buttons
+        player.x, player.y = self.game.clamp_position(dequantize(x), dequantize(y))  # Same bounds as a local player
+
+    def tick(self):
+        # Run one tick of game logic and send snapshots when they're due
+        start = time.perf_counter()
+        game = self.game
+        with contextlib.nullcontext() if self.verbose else contextlib.redirect_stdout(self.log):
+            for player in game.players.values():
+                game.apply_input(player)
+            game.run_logic()
+        self.tick_count += 1
+        if self.tick_count % self.snapshot_interval == 0:
+            self.broadcast()
+        self.tick_times.append(time.perf_counter() - start)
+
+        if start - self.report_start >= self.report_interval:
+            self.report()
+
+    def broadcast(self):
+        # Send every client the current state as a delta from its acknowledged snapshot
+        self.sequence += 1
+        snapshot = self.game.capture_snapshot(self.sequence, self.tick_count)
+        self.history[self.sequence] = snapshot.entities
+        self.history.pop(self.sequence - self.history_size, None)
+
+        for player in self.game.players.values():
+            if player.address is None:
+                continue  # No input yet - address unknown
+            baseline = self.history.get(player.acked_sequence)
+            if baseline is None:
+                data = encode_snapshot(snapshot, 0, {})
+                self.full_snapshots += 1
+            else:
+                data = encode_snapshot(snapshot, player.acked_sequence, baseline)
+            self.transport.sendto(data, player.address)
+            player.bytes_sent += len(data)
+            self.bytes_sent += len(data)
+            self.snapshots_sent += 1
+            self.clients_served.add(player.player_id)
+
+    def report(self):
+        # Print tick time and bandwidth since the last report, then reset the counters
+        elapsed = max(1e-6, time.perf_counter() - self.report_start)
+        if self.tick_times:
+            average = sum(self.tick_times) / len(self.tick_times) * 1000
+            worst = max(self.tick_times) * 1000
+            clients = max(1, len(self.clients_served))
+            print(f"{len(self.tick_times) / elapsed:.1f} ticks/s, tick {average:.2f} ms avg / {worst:.2f} ms max | "
+                  f"{self.snapshots_sent} snapshots ({self.full_snapshots} full), "
+                  f"avg {self.bytes_sent / max(1, self.snapshots_sent):.0f} B | "
+                  f"out {self.bytes_sent / elapsed / 1024:.1f} KiB/s ({self.bytes_sent / elapsed / 1024 / clients:.1f} per client), "
+                  f"in {self.bytes_received / elapsed / 1024:.1f} KiB/s | "
+                  f"{len(self.game.players)} players, {len(self.game.enemies)} enemies, "
+                  f"{len(self.game.bullets) + len(self.game.rockets)} projectiles")
+        self.report_start = time.perf_counter()
+        self.tick_times = []
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.snapshots_sent = 0
+        self.full_snapshots = 0
+        self.clients_served = set()
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='PyShoot co-op server')
+    parser.add_argument('--host', default='127.0.0.1', help='address to listen on (default: %(default)s)')
+    parser.add_argument('--port', type=int, default=5555, help='TCP and UDP port (default: %(default)s)')
+    parser.add_argument('--tick-rate', type=int, default=60, help='game ticks per second (default: %(default)s)')
+    parser.add_argument('--snapshot-rate', type=int, default=20, help='snapshots per second (default: %(default)s)')
+    parser.add_argument('--max-players', type=int, default=4, help='player limit (default: %(default)s)')
+    parser.add_argument('--duration', type=float, help='stop after this many seconds')
+    parser.add_argument('--verbose', action='store_true', help="show the game's log output")
+    args = parser.parse_args()
+
+    server = GameServer(args.host, args.port, args.tick_rate, args.snapshot_rate, args.max_players,
+                        verbose=args.verbose)
+    try:
+        asyncio.run(server.run(args.duration))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,168 @@
+# netcode.py
+
+import struct
+
+# Wire format shared by the co-op server (net_server.py) and its clients (net_client.py)
+# TCP carries the handshake (one JSON line from the server); everything else is UDP:
+# clients send their input every frame and the server sends entity snapshots at a fixed
+# rate, delta-encoded against the last snapshot each client acknowledged.
+PROTOCOL_VERSION = 1
+
+# Message types (first byte of every UDP packet)
+INPUT = 1
+SNAPSHOT = 2
+
+# Entity kinds
+BULLET = 0
+ROCKET = 1
+ENEMY = 2
+
+# Positions are sent as signed 16-bit quarter pixels
+POSITION_SCALE = 4
+
+# Input buttons bitfield
+FIRE = 1            # Left mouse - bullets; also starts a game
+ROCKET_FIRE = 2     # Right mouse - rockets
+UPGRADE_LEFT = 4    # Choose the left gun upgrade
+UPGRADE_RIGHT = 8   # Choose the right gun upgrade
+
+# Snapshot flags bitfield
+GAME_ACTIVE = 1
+UPGRADE_AVAILABLE = 2
+
+# Player flags bitfield
+ALIVE = 1
+FIRING = 2
+ROCKET_FIRING = 4
+
+# Entity record field mask
+NEW = 1             # Entity isn't in the baseline - full record follows
+SMALL_MOVE = 2      # Position changed by less than 32 pixels - signed byte offsets follow
+MOVE = 4            # Position changed further - full position follows
+HEALTH = 8          # Health changed - new health follows
+
+# Client -> server: type, player id, token, input sequence, acknowledged snapshot sequence, x, y, buttons
+INPUT_MESSAGE = struct.Struct('<BBIIIhhB')
+
+# Server -> client: type, sequence, baseline sequence (0 = full snapshot), server tick, score,
+# flags, left and right weapon levels, player count, entity record count, removed entity count
+SNAPSHOT_HEADER = struct.Struct('<BIIIIBBBBHH')
+PLAYER_RECORD = struct.Struct('<BhhBBB')   # Player id, x, y, health, invulnerable frames, flags
+ENTITY_HEADER = struct.Struct('<IB')       # Entity id, field mask
+NEW_ENTITY = struct.Struct('<BhhHB')       # Kind, x, y, sprite id, health (0-255)
+SMALL_MOVE_FIELDS = struct.Struct('<bb')   # dx, dy
+MOVE_FIELDS = struct.Struct('<hh')         # x, y
+HEALTH_FIELDS = struct.Struct('<B')        # health
+REMOVED_ENTITY = struct.Struct('<I')       # Entity id
+
+class Snapshot(object):
+    # Decoded snapshot - game state at one server tick
+    # entities: entity id -> (kind, x, y, sprite id, health) with quantized positions
+    # players: player id -> (x, y, health, invulnerable frames, flags) with quantized positions
+    def __init__(self, sequence, tick, score, flags, left_weapon_level, right_weapon_level, players, entities):
+        self.sequence = sequence
+        self.tick = tick
+        self.score = score
+        self.flags = flags
+        self.left_weapon_level = left_weapon_level
+        self.right_weapon_level = right_weapon_level
+        self.players = players
+        self.entities = entities
+
+def quantize(value):
+    # Convert a position in pixels to the wire format
+    return max(-32768, min(32767, int(round(value * POSITION_SCALE))))
+
+def dequantize(value):
+    # Convert a position from the wire format to pixels
+    return value / POSITION_SCALE
+
+def encode_snapshot(snapshot, baseline_sequence, baseline):
+    # Encode a snapshot as changes from a baseline entity state the client already has
+    # baseline_sequence 0 with an empty baseline makes a full snapshot
+    records = []
+    record_count = 0
+    for entity_id, entity in snapshot.entities.items():
+        old = baseline.get(entity_id)
+        if old == entity:
+            continue  # Unchanged - not sent at all
+        record_count += 1
+        if old is None or old[0] != entity[0] or old[3] != entity[3]:
+            records.append(ENTITY_HEADER.pack(entity_id, NEW))
+            records.append(NEW_ENTITY.pack(*entity))
+            continue
+
+        mask = 0
+        fields = []
+        dx = entity[1] - old[1]
+        dy = entity[2] - old[2]
+        if dx or dy:
+            if -128 <= dx <= 127 and -128 <= dy <= 127:
+                mask |= SMALL_MOVE
+                fields.append(SMALL_MOVE_FIELDS.pack(dx, dy))
+            else:
+                mask |= MOVE
+                fields.append(MOVE_FIELDS.pack(entity[1], entity[2]))
+        if entity[4] != old[4]:
+            mask |= HEALTH
+            fields.append(HEALTH_FIELDS.pack(entity[4]))
+        records.append(ENTITY_HEADER.pack(entity_id, mask))
+        records.extend(fields)
+
+    removed = [REMOVED_ENTITY.pack(entity_id) for entity_id in baseline if entity_id not in snapshot.entities]
+    players = [PLAYER_RECORD.pack(player_id, *player) for player_id, player in snapshot.players.items()]
+    header = SNAPSHOT_HEADER.pack(
+        SNAPSHOT, snapshot.sequence, baseline_sequence, snapshot.tick, snapshot.score, snapshot.flags,
+        snapshot.left_weapon_level, snapshot.right_weapon_level, len(players), record_count, len(removed))
+    return b''.join([header] + players + records + removed)
+
+def decode_snapshot(data, get_baseline):
+    # Decode a snapshot packet
+    # get_baseline: function returning the entity state of an earlier snapshot sequence, or None
+    # Raises ValueError if the packet is malformed or its baseline is no longer known
+    try:
+        (message_type, sequence, baseline_sequence, tick, score, flags, left_level, right_level,
+         player_count, record_count, removed_count) = SNAPSHOT_HEADER.unpack_from(data, 0)
+        if message_type != SNAPSHOT:
+            raise ValueError("Not a snapshot")
+        baseline = {} if baseline_sequence == 0 else get_baseline(baseline_sequence)
+        if baseline is None:
+            raise ValueError(f"Unknown baseline {baseline_sequence}")
+        offset = SNAPSHOT_HEADER.size
+
+        players = {}
+        for _ in range(player_count):
+            player_id, *player = PLAYER_RECORD.unpack_from(data, offset)
+            players[player_id] = tuple(player)
+            offset += PLAYER_RECORD.size
+
+        entities = dict(baseline)
+        for _ in range(record_count):
+            entity_id, mask = ENTITY_HEADER.unpack_from(data, offset)
+            offset += ENTITY_HEADER.size
+            if mask & NEW:
+                entities[entity_id] = NEW_ENTITY.unpack_from(data, offset)
+                offset += NEW_ENTITY.size
+                continue
+            kind, x, y, sprite, health = entities[entity_id]
+            if mask & SMALL_MOVE:
+                dx, dy = SMALL_MOVE_FIELDS.unpack_from(data, offset)
+                x += dx
+                y += dy
+                offset += SMALL_MOVE_FIELDS.size
+            if mask & MOVE:
+                x, y = MOVE_FIELDS.unpack_from(data, offset)
+                offset += MOVE_FIELDS.size
+            if mask & HEALTH:
+                (health,) = HEALTH_FIELDS.unpack_from(data, offset)
+                offset += HEALTH_FIELDS.size
+            entities[entity_id] = (kind, x, y, sprite, health)
+
+        for _ in range(removed_count):
+            (entity_id,) = REMOVED_ENTITY.unpack_from(data, offset)
+            entities.pop(entity_id, None)
+            offset += REMOVED_ENTITY.size
+    except (struct.error, KeyError) as error:
+        raise ValueError(f"Malformed snapshot: {error}") from None
+
+    return Snapshot(sequence, tick, score, flags, left_level, right_level, players, entities)
@@ -0,0 +1,69 @@
+# render_benchmark.py
+
+import argparse
+import contextlib
+import os
+import random
+import time
+
+# Benchmark of the pipelined renderer (--pipelined-render) against drawing every layer on the
+# main thread. Plays the same scripted game both ways without frame pacing and reports the
+# main thread's frame time (events, logic, drawing and presenting). The pipeline can only win
+# when its worker gets a core of its own - compare the results on a multi-core machine.
+#
+# Usage: python render_benchmark.py [--frames N] [--window]
+
+def run(game_module, frames, pipelined):
+    # Play frames scripted frames and return the frame times (seconds) and the pipeline used
+    random.seed(1)
+    game = game_module.Game(0, 0)
+    if pipelined:
+        game.start_layer_pipeline()
+    game.game_active = True
+    game.mouse_held = True
+    game.right_mouse_held = True
+    times = []
+    for _ in range(frames):
+        start = time.perf_counter()
+        game.process_events()
+        game.run_logic()
+        game.display_frame(game.presenter.surface)
+        times.append(time.perf_counter() - start)
+
+        # Keep the game going - stay alive and always take the left gun upgrade
+        game.player_invulnerable = game.player_invulnerable_duration
+        if game.upgrade_available:
+            game.upgrade_left_weapon()
+            game.upgrade_available = False
+    pipeline = game.layer_pipeline
+    if pipeline is not None:
+        pipeline.close()
+    game.stats_store.close()
+    return times, pipeline
+
+def summarize(name, times):
+    # Print frame time statistics
+    times = sorted(times)
+    average = sum(times) / len(times)
+    print(f"{name:10} {average * 1000:6.2f} ms avg  {times[len(times) // 2] * 1000:6.2f} ms median  "
+          f"{times[int(len(times) * 0.95) - 1] * 1000:6.2f} ms p95")
+    return average
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='PyShoot pipelined renderer benchmark')
+    parser.add_argument('--frames', type=int, default=1200, help='frames per run (default: %(default)s)')
+    parser.add_argument('--window', action='store_true', help='open a real window instead of rendering headless')
+    args = parser.parse_args()
+    if not args.window:
+        os.environ['SDL_VIDEODRIVER'] = 'dummy'
+    import PyShoot
+
+    print(f"{os.cpu_count()} CPUs, {args.frames} frames per run")
+    with open(os.devnull, 'w') as log, contextlib.redirect_stdout(log):  # The game logs every frame
+        run(PyShoot, 60, False)  # Warm up the sprite and font caches
+        sync_times, _ = run(PyShoot, args.frames, False)
+        pipelined_times, pipeline = run(PyShoot, args.frames, True)
+    sync = summarize('sync', sync_times)
+    pipelined = summarize('pipelined', pipelined_times)
+    print(f"Pipelined frame time {(pipelined - sync) / sync * 100:+.1f}%")
+    pipeline.report()
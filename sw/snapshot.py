@@ -0,0 +1,144 @@
+# snapshot.py
+
+import struct
+from array import array
+
+from ecs import ACTIVE
+
+# Snapshot header - magic bytes and format version
+SNAPSHOT_MAGIC = b'PYSS'
+SNAPSHOT_VERSION = 4
+HEADER = struct.Struct('<4sH')
+
+# Scalar Game attributes, packed in this order into a single struct
+SCALAR_FIELDS = [
+    'score', 'session_number', 'animation_tick',
+    'muzzle_flash_frame', 'fire_cooldown', 'rocket_flash_frame', 'rocket_fire_cooldown',
+    'last_upgrade_score', 'left_weapon_level', 'right_weapon_level',
+    'enemy_spawn_cooldown', 'player_health', 'player_invulnerable', 'session_points'
+]
+# Boolean Game attributes, packed as bits of one integer
+FLAG_FIELDS = [
+    'game_active', 'game_started', 'game_paused', 'upgrade_available',
+    'is_firing', 'mouse_held', 'is_rocket_firing', 'right_mouse_held'
+]
+# scalars, flags, cloud offset, session elapsed ms, bullet/rocket kills, next entity id, upgrade count
+SCALARS = struct.Struct('<' + 'q' * len(SCALAR_FIELDS) + 'Hd' + 'qqq' + 'QI')
+
+# Archetypes written to the snapshot, in this order - each is a row count followed by
+# the entity id column and then every component column, as raw array bytes
+ARCHETYPES = ['bullets', 'rockets', 'enemies']
+COUNT = struct.Struct('<I')
+
+# Upgrade history layout - one flat array of doubles
+UPGRADE_STRIDE = 4  # weapon id, level, score, session time
+
+# Weapon ids used in the upgrade history
+WEAPONS = ['bullets', 'rockets']
+
+def save_snapshot(game, now):
+    # Serialise the full game state into a compact bytes object
+    # Entities are written straight from their component arrays; enemy sprites are
+    # already stored by id (index in game.enemy_sprites) rather than by surface
+    # now: current pygame ticks (ms), used to store the session clock as elapsed time
+    upgrades = array('d')
+    for weapon, level, score, session_time in game.session_upgrades:
+        upgrades.extend((WEAPONS.index(weapon), level, score, session_time))
+
+    flags = 0
+    for bit, name in enumerate(FLAG_FIELDS):
+        if getattr(game, name):
+            flags |= 1 << bit
+
+    parts = [
+        HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION),
+        SCALARS.pack(
+            *[int(getattr(game, name)) for name in SCALAR_FIELDS],
+            flags, game.cloud_offset,
+            now - game.session_start_time,
+            game.session_kills.get('bullets', 0), game.session_kills.get('rockets', 0),
+            game.world.next_id, len(game.session_upgrades))
+    ]
+
+    # Dead entities are flushed at the end of every logic frame, so all rows are live here
+    for name in ARCHETYPES:
+        archetype = game.world.archetypes[name]
+        parts.append(COUNT.pack(len(archetype)))
+        parts.append(archetype.ids.tobytes())
+        for field in archetype.fields:
+            parts.append(archetype.columns[field].tobytes())
+
+    parts.append(upgrades.tobytes())
+    return b''.join(parts)
+
+def load_snapshot(game, data, now):
+    # Restore the full game state from bytes produced by save_snapshot
+    # Raises ValueError if the data is not a snapshot of this format version
+    if len(data) < HEADER.size + SCALARS.size:
+        raise ValueError("Snapshot is truncated")
+    magic, version = HEADER.unpack_from(data, 0)
+    if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+        raise ValueError(f"Not a version {SNAPSHOT_VERSION} snapshot")
+
+    values = SCALARS.unpack_from(data, HEADER.size)
+    count = len(SCALAR_FIELDS)
+    (flags, cloud_offset, session_elapsed, bullet_kills, rocket_kills,
+     next_id, upgrade_count) = values[count:]
+    offset = HEADER.size + SCALARS.size
+
+    # Read every archetype into temporary arrays first so a truncated snapshot leaves the game untouched
+    def read_array(typecode, length):
+        nonlocal offset
+        values = array(typecode)
+        size = length * values.itemsize
+        if offset + size > len(data):
+            raise ValueError("Snapshot is truncated")
+        values.frombytes(data[offset:offset + size])
+        offset += size
+        return values
+
+    loaded = {}
+    for name in ARCHETYPES:
+        archetype = game.world.archetypes[name]
+        if offset + COUNT.size > len(data):
+            raise ValueError("Snapshot is truncated")
+        (rows,) = COUNT.unpack_from(data, offset)
+        offset += COUNT.size
+        ids = read_array('Q', rows)
+        columns = {field: read_array(archetype.columns[field].typecode, rows) for field in archetype.fields}
+        loaded[name] = (ids, columns)
+    upgrades = read_array('d', upgrade_count * UPGRADE_STRIDE)
+
+    # Apply the state
+    for name, value in zip(SCALAR_FIELDS, values[:count]):
+        setattr(game, name, value)
+    for bit, name in enumerate(FLAG_FIELDS):
+        setattr(game, name, bool(flags & (1 << bit)))
+    game.cloud_offset = cloud_offset
+    game.session_start_time = now - session_elapsed
+    game.session_kills = {'bullets': bullet_kills, 'rockets': rocket_kills}
+    game.session_upgrades = [
+        (WEAPONS[int(upgrades[i])], int(upgrades[i + 1]), int(upgrades[i + 2]), upgrades[i + 3])
+        for i in range(0, len(upgrades), UPGRADE_STRIDE)
+    ]
+
+    # Columns are refilled in place so the archetype attributes keep pointing at them
+    game.world.clear()
+    game.world.next_id = next_id
+    game.pending_hits = []
+    for name, (ids, columns) in loaded.items():
+        archetype = game.world.archetypes[name]
+        archetype.ids.extend(ids)
+        for field, column in columns.items():
+            archetype.columns[field].extend(column)
+        for row, entity_id in enumerate(ids):
+            archetype.rows[entity_id] = row
+
+    # Rebuild the enemy spatial index (ACTIVE enemies only) and the draw/collision row sets
+    enemies = game.enemies
+    game.enemy_grid.clear()
+    for row in range(len(enemies)):
+        if enemies.state[row] == ACTIVE:
+            game.enemy_grid.insert(enemies.ids[row], enemies.x[row], enemies.y[row],
+                                   enemies.width[row], enemies.height[row])
+    game.lifecycle_stage()
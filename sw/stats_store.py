@@ -0,0 +1,131 @@
+# stats_store.py
+
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+# Default database location - next to the resources folder, outside the source tree
+STATS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'pyshoot_stats.db')
+
+class StatsStore(object):
+    # Persistent high-score and session statistics store (SQLite in WAL mode)
+    # All disk access happens on a background thread: the game only queues finished
+    # sessions and reads the cached leaderboard, so gameplay frames never block on disk
+    def __init__(self, path=STATS_FILE, leaderboard_size=5):
+        self.path = path                          # Database file
+        self.leaderboard_size = leaderboard_size  # Number of top sessions kept in the cached leaderboard
+        self.leaderboard = []                     # Cached (score, session_number, duration, played_at) rows
+        self.pending = queue.Queue()              # Sessions waiting to be written (None = stop)
+
+        # Start the writer thread - it opens the database and loads the initial leaderboard
+        self.worker = threading.Thread(target=self.run_worker, name='StatsStore', daemon=True)
+        self.worker.start()
+
+    def record_session(self, session):
+        # Queue a finished session for writing - returns immediately
+        # session: dict with session_number, score (points earned in the session, before any
+        # were spent on upgrades), duration, kills (weapon -> count) and upgrades (list of
+        # (weapon, level, score balance after the upgrade, seconds into the session))
+        self.pending.put(session)
+
+    def close(self):
+        # Flush all queued sessions and stop the writer thread
+        self.pending.put(None)
+        self.worker.join()
+
+    def run_worker(self):
+        # Background thread: owns the SQLite connection for its whole lifetime
+        try:
+            connection = sqlite3.connect(self.path)
+        except sqlite3.Error as error:
+            print(f"Stats disabled - could not open {self.path}: {error}")
+            connection = None
+        else:
+            self.create_tables(connection)
+            self.leaderboard = self.read_leaderboard(connection)
+
+        while True:
+            session = self.pending.get()
+            if session is None:
+                break
+            if connection is None:
+                continue  # Keep draining the queue so close() never hangs
+
+            # Batch everything that's already queued into a single transaction
+            batch = [session]
+            stop = False
+            while True:
+                try:
+                    session = self.pending.get_nowait()
+                except queue.Empty:
+                    break
+                if session is None:
+                    stop = True
+                    break
+                batch.append(session)
+
+            try:
+                with connection:
+                    for session in batch:
+                        self.write_session(connection, session)
+                self.leaderboard = self.read_leaderboard(connection)
+            except sqlite3.Error as error:
+                print(f"Could not save session stats: {error}")
+
+            if stop:
+                break
+
+        if connection is not None:
+            connection.close()
+
+    def create_tables(self, connection):
+        # Create the schema - WAL lets the leaderboard be read while a session is being written
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=NORMAL')
+        with connection:
+            connection.execute('''
+                CREATE TABLE IF NOT EXISTS sessions (
+                    id INTEGER PRIMARY KEY,
+                    session_number INTEGER NOT NULL,
+                    score INTEGER NOT NULL,
+                    duration REAL NOT NULL,
+                    played_at REAL NOT NULL
+                )''')
+            connection.execute('''
+                CREATE TABLE IF NOT EXISTS kills (
+                    session_id INTEGER NOT NULL REFERENCES sessions(id),
+                    weapon TEXT NOT NULL,
+                    count INTEGER NOT NULL
+                )''')
+            connection.execute('''
+                CREATE TABLE IF NOT EXISTS upgrades (
+                    session_id INTEGER NOT NULL REFERENCES sessions(id),
+                    weapon TEXT NOT NULL,
+                    level INTEGER NOT NULL,
+                    score INTEGER NOT NULL,
+                    session_time REAL NOT NULL
+                )''')
+            # Leaderboard reads walk this index instead of sorting the whole table
+            connection.execute('CREATE INDEX IF NOT EXISTS sessions_by_score ON sessions (score DESC)')
+
+    def write_session(self, connection, session):
+        # Insert one session with its kills and upgrade history
+        cursor = connection.execute(
+            'INSERT INTO sessions (session_number, score, duration, played_at) VALUES (?, ?, ?, ?)',
+            (session['session_number'], session['score'], session['duration'], session.get('played_at', time.time())))
+        session_id = cursor.lastrowid
+        connection.executemany(
+            'INSERT INTO kills (session_id, weapon, count) VALUES (?, ?, ?)',
+            [(session_id, weapon, count) for weapon, count in session['kills'].items()])
+        connection.executemany(
+            'INSERT INTO upgrades (session_id, weapon, level, score, session_time) VALUES (?, ?, ?, ?, ?)',
+            [(session_id, weapon, level, score, session_time)
+             for weapon, level, score, session_time in session['upgrades']])
+
+    def read_leaderboard(self, connection):
+        # Read the top sessions by score
+        return connection.execute(
+            'SELECT score, session_number, duration, played_at FROM sessions ORDER BY score DESC LIMIT ?',
+            (self.leaderboard_size,)).fetchall()
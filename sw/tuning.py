@@ -0,0 +1,109 @@
+# tuning.py
+
+import json
+import os
+
+# Default tuning file - balance values and sprite lists, edited while the game runs
+TUNING_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'res', 'tuning.json')
+
+# Values used when the tuning file is missing or leaves a value out
+DEFAULT_TUNING = {
+    'fire_rate': 5,                     # Minimum frames between shots
+    'rocket_fire_rate': 7,              # Minimum frames between rockets
+    'enemy_spawn_rate': 60,             # Frames between enemy spawns (1 second at 60 FPS)
+    'enemy_health': 6,                  # Enemy health (6 for bullets=4 hits, rockets=3 hits with 2 damage each)
+    'upgrade_costs': [200, 300, 400, 500],  # Upgrade cost from level 1, 2, 3, ...
+    'upgrade_cost_step': 100,           # Extra cost per level past the end of upgrade_costs
+    'enemy_sprites': ['C%d.png' % number for number in range(1, 19)]  # Enemy sprite names (SpaceShipsPack)
+}
+
+# Values counted in whole frames or points - frame counters are saved as integers in snapshots
+INTEGER_TUNING = ('fire_rate', 'rocket_fire_rate', 'enemy_spawn_rate', 'upgrade_cost_step')
+
+class TuningWatcher(object):
+    # Watches the tuning file and a set of asset files for changes with cheap mtime polling
+    # Nothing is re-read unless its modification time changed, so polling costs a few stat calls
+    def __init__(self, path=TUNING_FILE, poll_interval=30):
+        self.path = path                    # Tuning file (JSON)
+        self.poll_interval = poll_interval  # Frames between polls
+        self.frame = 0                      # Frames since the last poll
+        self.mtime = None                   # Modification time of the loaded tuning file
+        self.assets = {}                    # Asset key -> (file paths, modification times when last seen)
+
+    def load(self):
+        # Read the tuning file, filling in defaults for missing values
+        # Returns None if the file can't be read, parsed or has invalid values (e.g. while it's
+        # being edited), so the current values are kept
+        values = dict(DEFAULT_TUNING)
+        try:
+            self.mtime = os.stat(self.path).st_mtime
+            with open(self.path) as tuning_file:
+                loaded = json.load(tuning_file)
+            if not isinstance(loaded, dict):
+                raise ValueError("expected a JSON object")
+            values.update(loaded)
+            check_tuning(values)
+        except FileNotFoundError:
+            self.mtime = None  # No tuning file - run with the defaults until one appears
+        except (OSError, ValueError) as error:
+            print(f"Could not load tuning file {self.path}: {error}")
+            return None
+        return values
+
+    def watch_assets(self, assets):
+        # Set the watched asset files (asset key -> tuple of file paths the asset can come from)
+        # Assets that were already watched keep their last seen modification times
+        watched = {}
+        for key, paths in assets.items():
+            previous = self.assets.get(key)
+            if previous is not None and previous[0] == paths:
+                watched[key] = previous
+            else:
+                watched[key] = (paths, [get_mtime(path) for path in paths])
+        self.assets = watched
+
+    def poll(self):
+        # Check for changes every poll_interval frames
+        # Returns (new tuning values or None, list of changed asset keys)
+        self.frame += 1
+        if self.frame < self.poll_interval:
+            return None, []
+        self.frame = 0
+
+        values = None
+        if get_mtime(self.path) != self.mtime:
+            values = self.load()
+
+        changed = []
+        for key, (paths, mtimes) in self.assets.items():
+            current = [get_mtime(path) for path in paths]
+            if current != mtimes:
+                self.assets[key] = (paths, current)
+                changed.append(key)
+        return values, changed
+
+def check_tuning(values):
+    # Raise ValueError if a tuning value has the wrong type or is out of range
+    for key in INTEGER_TUNING:
+        if not is_integer(values[key]) or values[key] < 0:
+            raise ValueError(f"{key} must be a whole number of at least 0")
+    health = values['enemy_health']
+    if isinstance(health, bool) or not isinstance(health, (int, float)) or not health > 0:
+        raise ValueError("enemy_health must be a number above 0")
+    costs = values['upgrade_costs']
+    if not isinstance(costs, list) or not costs or not all(is_integer(cost) and cost >= 0 for cost in costs):
+        raise ValueError("upgrade_costs must be a non-empty list of whole numbers of at least 0")
+    sprites = values['enemy_sprites']
+    if not isinstance(sprites, list) or not sprites or not all(isinstance(name, str) and name for name in sprites):
+        raise ValueError("enemy_sprites must be a non-empty list of file names")
+
+def is_integer(value):
+    # Check for a JSON whole number (true/false aren't numbers here)
+    return isinstance(value, int) and not isinstance(value, bool)
+
+def get_mtime(path):
+    # Get a file's modification time, or None if it doesn't exist
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None